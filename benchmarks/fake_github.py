@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 17:36>
+
+"""
+Local stand-in for the Github API, serving synthetic events at any scale.
+
+It answers every request `daily-summary` makes, over REST and GraphQL, with
+`--events` events per source on `--date`. Responses are paginated like Github's,
+carry rate limit headers and are delayed by `--latency`, so the whole pipeline
+can be load tested offline:
+
+    uv run python -m benchmarks.fake_github --events 5000 --latency 50
+    uv run task cli --api-url http://127.0.0.1:8765 --no-cache -t fake \\
+        daily-summary --date 2025-03-16 --no-ollama --no-store
+"""
+
+import json
+import re
+import threading
+import time
+from datetime import UTC, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, cast
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import click
+
+PAGE_SIZE = 100
+
+# Top-level selections of a GraphQL document, optionally aliased.
+_SELECTION = re.compile(
+    r"^  (?:(\w+): )?(search|viewer|user|repository|nodes)\b", re.MULTILINE
+)
+_AFTER = re.compile(r'after: (null|"[^"]*")')
+
+
+class FakeGithub:
+    """Synthetic Github data, `events` per source, all happening on `date`."""
+
+    def __init__(self, events: int, date: str, username: str, rate_limit: int) -> None:
+        self.events = events
+        self.date = date
+        self.username = username
+        self.rate_limit = rate_limit
+
+        self._used: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def rate_limit_headers(self, resource: str) -> dict[str, str]:
+        with self._lock:
+            used = self._used[resource] = self._used.get(resource, 0) + 1
+
+        return {
+            "x-ratelimit-resource": resource,
+            "x-ratelimit-limit": str(self.rate_limit),
+            "x-ratelimit-used": str(used),
+            "x-ratelimit-remaining": str(max(self.rate_limit - used, 0)),
+            "x-ratelimit-reset": str(int(time.time()) + 3600),
+        }
+
+    def at(self, i: int) -> str:
+        return f"{self.date}T{(i // 60) % 24:02}:{i % 60:02}:00Z"
+
+    def page(self, after: str | None) -> tuple[range, dict[str, Any]]:
+        offset = int(json.loads(after)) if after and after != "null" else 0
+        end = min(offset + PAGE_SIZE, self.events)
+        page_info = {"hasNextPage": end < self.events, "endCursor": json.dumps(end)}
+        return range(offset, end), page_info
+
+    def issue(self, i: int) -> dict[str, Any]:
+        kind, path = ("PR", "pull") if i % 2 else ("I", "issues")
+        return {
+            "id": f"{kind}_{i}",
+            "title": f"Synthetic {path} #{i}",
+            "body": "Lorem ipsum " * 20,
+            "url": f"https://github.com/{self.repository(i)}/{path}/{i}",
+            "repository": {"nameWithOwner": self.repository(i)},
+            "createdAt": self.at(i),
+            "updatedAt": self.at(i),
+            "state": "OPEN",
+            "mergedAt": None,
+        }
+
+    def review(self, i: int) -> dict[str, Any]:
+        return {
+            "author": {"login": self.username},
+            "state": "APPROVED",
+            "createdAt": self.at(i),
+            "updatedAt": self.at(i),
+            "url": f"https://github.com/{self.repository(i)}/pull/{i}#review-{i}",
+        }
+
+    def repository(self, i: int) -> str:
+        return f"org-{i % 7}/repo-{i % 23}"
+
+    def commit(self, i: int, api_url: str) -> dict[str, Any]:
+        repository = self.repository(i)
+        return {
+            "node_id": f"C_{i}",
+            "sha": f"{i:040x}",
+            "url": f"{api_url}/repos/{repository}/commits/{i:040x}",
+            "html_url": f"https://github.com/{repository}/commit/{i:040x}",
+            "commit": {
+                "message": f"Synthetic commit {i}\n\nWith a body.",
+                "committer": {"date": self.at(i)},
+            },
+            "repository": {"full_name": repository},
+        }
+
+    def search(self, query: str, after: str | None) -> dict[str, Any]:
+        indexes, page_info = self.page(after)
+        nodes = [self.issue(i) for i in indexes]
+        if "reviewed-by:" in query:
+            nodes = [
+                node | {"id": f"PR_{i}", "reviews": {"nodes": [self.review(i)]}}
+                for i, node in zip(indexes, nodes, strict=True)
+            ]
+
+        return {
+            "issueCount": self.events,
+            "pageInfo": page_info,
+            "edges": [{"node": node} for node in nodes],
+        }
+
+    def comments(self, after: str | None) -> dict[str, Any]:
+        indexes, page_info = self.page(after)
+        return {
+            "pageInfo": page_info,
+            "edges": [
+                {
+                    "node": {
+                        "url": f"https://github.com/{self.repository(i)}/issues/{i}"
+                        f"#issuecomment-{i}",
+                        "body": "Lorem ipsum " * 10,
+                        "createdAt": self.at(i),
+                        "updatedAt": self.at(i),
+                        "repository": {"nameWithOwner": self.repository(i)},
+                        "issue": {
+                            "id": f"I_{i}",
+                            "title": f"Issue #{i}",
+                            "state": "OPEN",
+                        },
+                        "pullRequest": None,
+                    }
+                }
+                for i in indexes
+            ],
+        }
+
+    def contributions(self, after: str | None) -> dict[str, Any]:
+        indexes, page_info = self.page(after)
+
+        def connection(nodes: list[dict[str, Any]]) -> dict[str, Any]:
+            return {"pageInfo": page_info, "edges": [{"node": n} for n in nodes]}
+
+        return {
+            "issueContributions": connection(
+                [{"issue": self.issue(i) | {"id": f"I_{i}"}} for i in indexes]
+            ),
+            "pullRequestContributions": connection(
+                [{"pullRequest": self.issue(i) | {"id": f"PR_{i}"}} for i in indexes]
+            ),
+            "pullRequestReviewContributions": connection(
+                [
+                    {
+                        "pullRequest": self.issue(i) | {"id": f"PR_{i}"},
+                        "pullRequestReview": self.review(i),
+                    }
+                    for i in indexes
+                ]
+            ),
+        }
+
+    def repositories(self, after: str | None) -> dict[str, Any]:
+        # A repository per 10 tags, each with its tags on a single page.
+        repositories = max(self.events // 10, 1)
+        offset = int(json.loads(after)) if after and after != "null" else 0
+        end = min(offset + PAGE_SIZE, repositories)
+
+        return {
+            "pageInfo": {
+                "hasNextPage": end < repositories,
+                "endCursor": json.dumps(end),
+            },
+            "edges": [
+                {
+                    "node": {
+                        "nameWithOwner": f"{self.username}/repo-{r}",
+                        "pushedAt": self.at(r),
+                        "refs": self.tags(r),
+                    }
+                }
+                for r in range(offset, end)
+            ],
+        }
+
+    def tags(self, repository: int) -> dict[str, Any]:
+        return {
+            "pageInfo": {"hasNextPage": False, "endCursor": None},
+            "edges": [
+                {
+                    "node": {
+                        "name": f"v{repository}.{tag}",
+                        "target": {
+                            "tagger": {"date": self.at(repository * 10 + tag)},
+                            "target": {"committedDate": self.at(repository * 10 + tag)},
+                        },
+                    }
+                }
+                for tag in range(min(10, self.events))
+            ],
+        }
+
+    def graphql(self, query: str, variables: dict[str, Any]) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "rateLimit": {
+                "limit": self.rate_limit,
+                "cost": 1,
+                "remaining": max(self.rate_limit - self._used.get("graphql", 0), 0),
+                "resetAt": datetime.fromtimestamp(time.time() + 3600, UTC).isoformat(),
+            }
+        }
+
+        matches = list(_SELECTION.finditer(query))
+        for match, following in zip(matches, [*matches[1:], None], strict=True):
+            alias, field = match.group(1), match.group(2)
+            selection = query[match.start() : following.start() if following else None]
+            after = (cursor := _AFTER.search(selection)) and cursor.group(1)
+
+            if field == "nodes":
+                value: Any = [
+                    {"signature": {"isValid": True}} for _ in variables.get("ids", [])
+                ]
+            elif field == "search":
+                value = self.search(selection, after)
+            elif field == "viewer":
+                value = {
+                    "login": self.username,
+                    "repositories": self.repositories(after),
+                }
+            elif field == "repository":
+                value = {"refs": self.tags(0) | {"edges": []}}
+            elif "contributionsCollection" in selection:
+                value = {"contributionsCollection": self.contributions(after)}
+            else:
+                value = {"issueComments": self.comments(after)}
+
+            data[alias or field] = value
+
+        return {"data": data}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        github = self._fake_server.github
+
+        if url.path == "/user":
+            return self._respond("core", {"login": github.username, "name": "Fake"})
+
+        if url.path == "/search/commits":
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            page = int(params.get("page", 1))
+            indexes, page_info = github.page(json.dumps((page - 1) * PAGE_SIZE))
+
+            headers = {}
+            if page_info["hasNextPage"]:
+                next_url = f"{self._api_url}/search/commits?" + urlencode(
+                    params | {"page": page + 1}
+                )
+                headers["link"] = f'<{next_url}>; rel="next"'
+
+            items = [github.commit(i, self._api_url) for i in indexes]
+            return self._respond(
+                "search", {"total_count": github.events, "items": items}, headers
+            )
+
+        if url.path.startswith("/repos/"):
+            return self._respond(
+                "core", {"commit": {"verification": {"verified": True}}}
+            )
+
+        self._respond("core", {"message": "Not Found"}, status=HTTPStatus.NOT_FOUND)
+
+    def do_POST(self) -> None:
+        if self.path != "/graphql":
+            self._respond("core", {"message": "Not Found"}, status=HTTPStatus.NOT_FOUND)
+            return
+
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        response = self._fake_server.github.graphql(
+            payload["query"], payload.get("variables") or {}
+        )
+        self._respond("graphql", response)
+
+    @property
+    def _fake_server(self) -> "_Server":
+        return cast(_Server, self.server)
+
+    @property
+    def _api_url(self) -> str:
+        return f"http://{self.headers['Host']}"
+
+    def _respond(
+        self,
+        resource: str,
+        payload: dict[str, Any],
+        headers: dict[str, str] | None = None,
+        status: HTTPStatus = HTTPStatus.OK,
+    ) -> None:
+        time.sleep(self._fake_server.latency)
+
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(content)))
+        for name, value in {
+            **self._fake_server.github.rate_limit_headers(resource),
+            **(headers or {}),
+        }.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self._fake_server.verbose:
+            super().log_message(format, *args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        github: FakeGithub,
+        latency: float,
+        verbose: bool,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.github = github
+        self.latency = latency
+        self.verbose = verbose
+
+
+def serve(
+    github: FakeGithub,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    latency: float = 0.0,
+    verbose: bool = False,
+) -> ThreadingHTTPServer:
+    """Start serving `github` from a background thread, until shut down."""
+
+    server = _Server((host, port), github, latency, verbose)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8765, show_default=True)
+@click.option(
+    "--events",
+    help="Events of each source",
+    type=click.IntRange(min=0),
+    default=1000,
+    show_default=True,
+)
+@click.option(
+    "--latency",
+    help="Delay of every response, in milliseconds",
+    type=click.FloatRange(min=0),
+    default=0,
+    show_default=True,
+)
+@click.option("--date", default="2025-03-16", show_default=True)
+@click.option("--username", default="benmezger", show_default=True)
+@click.option(
+    "--rate-limit",
+    help="Requests allowed per resource, as reported in rate limit headers",
+    type=click.IntRange(min=1),
+    default=5000,
+    show_default=True,
+)
+@click.option("-v", "--verbose", is_flag=True, help="Log every request")
+def main(
+    host: str,
+    port: int,
+    events: int,
+    latency: float,
+    date: str,
+    username: str,
+    rate_limit: int,
+    verbose: bool,
+) -> None:
+    github = FakeGithub(events, date, username, rate_limit)
+    server = serve(github, host, port, latency / 1000, verbose)
+
+    click.echo(f"Serving a fake Github API at http://{host}:{port}", err=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
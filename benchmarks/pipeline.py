@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 18:05>
+
+"""
+Time the hot paths between fetching events and writing a summary.
+
+Synthetic events are validated, grouped by repository, ordered by organization
+and rendered, with and without escaping, at every size in `--sizes`. Results
+are written as JSON, so they can be compared against those of another commit:
+
+    uv run python -m benchmarks.pipeline --output before.json
+    uv run python -m benchmarks.pipeline --compare before.json
+
+`--compare` exits with an error when a stage got slower than `--threshold`.
+"""
+
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import click
+
+from daily._pipeline import group_by_repository
+from daily._summary import maybe_write_github_summaries, order_by_org_event_type
+from daily.models import (
+    EventSource,
+    EventTable,
+    EventType,
+    GithubEvent,
+    RepositoryEvents,
+    validate_events,
+)
+
+from .fake_github import FakeGithub
+
+DATE = "2025-03-16"
+# Raw events are generated and validated in chunks, so a million of them fit in
+# memory alongside the validated events.
+CHUNK_SIZE = 10_000
+SECTIONS: list[tuple[tuple[EventType, ...], bool | None]] = [
+    ((EventType.ISSUE, EventType.PULL_REQUEST), None),
+    ((EventType.REVIEW,), None),
+    ((EventType.TAG,), None),
+    ((EventType.COMMENT,), None),
+    ((EventType.COMMIT,), False),
+    ((EventType.COMMIT,), True),
+]
+# Source fetching each of the events of `raw_events`, by index modulo 6.
+SOURCES = (
+    EventSource.ISSUES,
+    EventSource.ISSUES,
+    EventSource.REVIEWS,
+    EventSource.COMMITS,
+    EventSource.COMMENTS,
+    EventSource.TAGS,
+)
+
+
+def raw_events(count: int, start: int = 0) -> list[dict[str, Any]]:
+    """
+    Github JSON as the sources validate it, mixing every type of event.
+
+    Validation mutates the items, so every run needs a fresh batch.
+    """
+
+    fake = FakeGithub(start + count, DATE, "benmezger", rate_limit=5000)
+    items = []
+
+    for i in range(start, start + count):
+        repository = fake.repository(i)
+        match i % 6:
+            case 0 | 1:
+                item = fake.issue(i)
+            case 2:
+                item = fake.issue(i) | {
+                    "id": f"PR_{i}",
+                    "reviews": {"nodes": [fake.review(i)]},
+                }
+            case 3:
+                item = fake.commit(i, "https://api.github.com")
+                # Every other commit is unverified.
+                item["committed_by_others"] = bool(i % 4)
+            case 4:
+                item = {
+                    "id": f"comment-{i}",
+                    "title": f"Commented on: Synthetic issue #{i}",
+                    "body": "Lorem ipsum " * 10,
+                    "url": f"https://github.com/{repository}/issues/{i}"
+                    f"#issuecomment-{i}",
+                    "created_at": fake.at(i),
+                    "repository": {"nameWithOwner": repository},
+                    "event_type": "Comment",
+                }
+            case _:
+                item = {
+                    "id": f"tag-{repository}-v{i}",
+                    "title": f"Tagged v{i}",
+                    "url": f"https://github.com/{repository}/releases/tag/v{i}",
+                    "created_at": fake.at(i),
+                    "repository": {"nameWithOwner": repository},
+                    "event_type": "Tag",
+                }
+        items.append(item)
+
+    return items
+
+
+def github_events(count: int) -> list[GithubEvent]:
+    return [
+        GithubEvent.model_validate(item)
+        for start in range(0, count, CHUNK_SIZE)
+        for item in raw_events(min(CHUNK_SIZE, count - start), start)
+    ]
+
+
+def validate(count: int) -> float:
+    """Time validating `count` raw events one by one, leaving generation out."""
+
+    elapsed = 0.0
+    for start in range(0, count, CHUNK_SIZE):
+        items = raw_events(min(CHUNK_SIZE, count - start), start)
+        started_at = time.perf_counter()
+        for item in items:
+            GithubEvent.model_validate(item)
+        elapsed += time.perf_counter() - started_at
+    return elapsed
+
+
+def validate_source(count: int, source: EventSource, batch: bool) -> float:
+    """
+    Time validating the events of `source` among `count` raw events, one by one
+    or a page at a time like the sources do.
+
+    Sources don't pass the type of their events along, which batches give.
+    """
+
+    elapsed = 0.0
+    for start in range(0, count, CHUNK_SIZE):
+        items = [
+            item
+            for i, item in enumerate(
+                raw_events(min(CHUNK_SIZE, count - start), start), start
+            )
+            if SOURCES[i % len(SOURCES)] == source
+        ]
+        if batch:
+            for item in items:
+                item.pop("event_type", None)
+
+        started_at = time.perf_counter()
+        if batch:
+            validate_events(items, source)
+        else:
+            for item in items:
+                GithubEvent.model_validate(item)
+        elapsed += time.perf_counter() - started_at
+    return elapsed
+
+
+def order(repository_events: list[RepositoryEvents]) -> None:
+    for event_types, committed_by_others in SECTIONS:
+        order_by_org_event_type(repository_events, event_types, committed_by_others)
+
+
+def render(repository_events: list[RepositoryEvents], escape: bool) -> None:
+    maybe_write_github_summaries(repository_events, None, io.StringIO(), escape)
+
+
+def measure(run: Callable[[], object], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        # Collect the previous run's garbage outside of the timing.
+        gc.collect()
+        started_at = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started_at)
+    return timings
+
+
+def benchmark(size: int, repeat: int) -> list[dict[str, Any]]:
+    events = github_events(size)
+    table = EventTable(events)
+    grouped = group_by_repository(events)
+
+    stages: dict[str, Callable[[], list[float]]] = {
+        "validate": lambda: [validate(size) for _ in range(repeat)],
+        **{
+            f"validate{'_batch' if batch else ''}[{source}]": (
+                lambda source=source, batch=batch: [
+                    validate_source(size, source, batch) for _ in range(repeat)
+                ]
+            )
+            for source in dict.fromkeys(SOURCES)
+            for batch in (False, True)
+        },
+        "group": lambda: measure(lambda: group_by_repository(events), repeat),
+        "group_table": lambda: measure(lambda: group_by_repository(table), repeat),
+        "order": lambda: measure(lambda: order(grouped), repeat),
+        "render": lambda: measure(lambda: render(grouped, escape=False), repeat),
+        "render_escaped": lambda: measure(lambda: render(grouped, escape=True), repeat),
+    }
+
+    results = []
+    for stage, timed in stages.items():
+        timings = timed()
+        results.append(
+            {
+                "stage": stage,
+                "events": size,
+                "median": statistics.median(timings),
+                "min": min(timings),
+            }
+        )
+    return results
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float
+) -> bool:
+    """Print how each stage changed from `baseline`, and whether any regressed."""
+
+    before = {(result["stage"], result["events"]): result for result in baseline}
+    regressed = False
+
+    click.echo(f"{'stage':<26}{'events':>10}{'before (s)':>12}{'after (s)':>12}{'':>9}")
+    for result in results:
+        if not (previous := before.get((result["stage"], result["events"]))):
+            continue
+
+        ratio = result["min"] / previous["min"]
+        slower = ratio > threshold
+        regressed |= slower
+        click.echo(
+            f"{result['stage']:<26}{result['events']:>10}{previous['min']:>12.4f}"
+            f"{result['min']:>12.4f}{ratio:>8.2f}x{' !' if slower else ''}"
+        )
+
+    return regressed
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="100,10000",
+    show_default=True,
+    help="Comma separated numbers of events, such as 100,10000,1000000.",
+)
+@click.option("--repeat", type=click.IntRange(min=1), default=5, show_default=True)
+@click.option("--output", type=click.Path(dir_okay=False, path_type=Path))
+@click.option(
+    "--compare",
+    "baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Results of a previous run to compare against.",
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=1),
+    default=1.2,
+    show_default=True,
+    help="Slowdown of a stage, relative to the baseline, counted as a regression.",
+)
+def main(
+    sizes: str,
+    repeat: int,
+    output: Path | None,
+    baseline: Path | None,
+    threshold: float,
+) -> None:
+    results = []
+    for size in (int(size) for size in sizes.split(",")):
+        click.echo(f"Benchmarking {size} events...", err=True)
+        results.extend(benchmark(size, repeat))
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": results,
+    }
+    if output:
+        output.write_text(json.dumps(report, indent=2))
+
+    if baseline:
+        previous = json.loads(baseline.read_text())["results"]
+        if compare(results, previous, threshold):
+            sys.exit(1)
+    elif not output:
+        click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 16:48>
+
+"""
+Compare the search and contributions sources of issues, pull requests and reviews.
+
+Both run against Github, with the token in `GITHUB_TOKEN` and without any cache,
+and report the number of requests, the events found and the median latency:
+
+    uv run python -m benchmarks.sources --from 2025-03-01 --to 2025-03-16
+"""
+
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from os import getenv
+
+import click
+import httpx
+
+from daily._pipeline import collect
+from daily.github import Exclusions, Github, RequestScheduler
+from daily.models import EventSource, GithubEvent
+
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self.requests = 0
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return await self._transport.handle_async_request(request)
+
+
+async def search(github: Github, since: datetime, until: datetime) -> list[GithubEvent]:
+    exclusions = Exclusions()
+    github.prefetch(since, [EventSource.ISSUES, EventSource.REVIEWS], exclusions, until)
+
+    issues, reviews = await asyncio.gather(
+        collect(github.issues_from(since, exclusions, until)),
+        collect(github.reviews_from(since, exclusions, until)),
+    )
+    return issues + reviews
+
+
+async def contributions(
+    github: Github, since: datetime, until: datetime
+) -> list[GithubEvent]:
+    return await collect(github.contributions_from(since, Exclusions(), until))
+
+
+async def measure(
+    source: str, token: str, username: str, since: datetime, until: datetime
+) -> tuple[int, int, float]:
+    scheduler = RequestScheduler()
+    transport = scheduler.atransport = CountingTransport(scheduler.atransport)
+    github = Github(token, username=username, scheduler=scheduler)
+
+    started_at = time.perf_counter()
+    events = await SOURCES[source](github, since, until)
+    elapsed = time.perf_counter() - started_at
+
+    return transport.requests, len(events), elapsed
+
+
+SOURCES = {"search": search, "contributions": contributions}
+
+
+@click.command()
+@click.option("-t", "--token", default=getenv("GITHUB_TOKEN", ""), required=True)
+@click.option("-u", "--username", default=getenv("GITHUB_USERNAME", "benmezger"))
+@click.option(
+    "--from", "since", type=click.DateTime(formats=("%Y-%m-%d",)), required=True
+)
+@click.option("--to", "until", type=click.DateTime(formats=("%Y-%m-%d",)))
+@click.option("--runs", type=click.IntRange(min=1), default=3, show_default=True)
+def main(
+    token: str, username: str, since: datetime, until: datetime | None, runs: int
+) -> None:
+    until = until or since
+
+    click.echo(f"{'source':<15}{'requests':>10}{'events':>10}{'median (s)':>12}")
+    for source in SOURCES:
+        results = [
+            asyncio.run(measure(source, token, username, since, until))
+            for _ in range(runs)
+        ]
+        requests, events, _ = results[-1]
+        latency = statistics.median(elapsed for _, _, elapsed in results)
+
+        click.echo(f"{source:<15}{requests:>10}{events:>10}{latency:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
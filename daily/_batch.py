@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 15:12>
+
+import tomllib
+from os import getenv
+from pathlib import Path
+
+from pydantic import BaseModel, Field, field_validator
+
+
+class BatchAccount(BaseModel):
+    """An account to summarize in a batch run."""
+
+    token_env: str
+    username: str
+    exclude_repositories: list[str] = Field(default_factory=list[str])
+    exclude_organizations: list[str] = Field(default_factory=list[str])
+    output: Path
+
+    @field_validator("exclude_repositories")
+    @classmethod
+    def validate_repository_names(cls, values: list[str]) -> list[str]:
+        for value in values:
+            if len(value.split("/")) != 2:
+                raise ValueError(
+                    "Expected repository in the format of 'username/repository'. "
+                    f"Got '{value}'"
+                )
+        return values
+
+    @property
+    def token(self) -> str | None:
+        return getenv(self.token_env)
+
+
+class BatchConfig(BaseModel):
+    accounts: list[BatchAccount]
+
+
+def load_batch_config(path: Path) -> BatchConfig:
+    """
+    Load a batch config file, listing the accounts to summarize.
+
+    ``` toml
+    [[accounts]]
+    token_env = "GH_TOKEN"
+    username = "benmezger"
+    exclude_repositories = ["benmezger/summaries"]
+    exclude_organizations = []
+    output = "daily-personal.md"
+    ```
+    """
+
+    with open(path, "rb") as file:
+        return BatchConfig.model_validate(tomllib.load(file))
@@ -6,27 +6,47 @@
 
 import asyncio
 import sys
-from collections import defaultdict
+import tomllib
 from collections.abc import Callable
 from datetime import datetime, timedelta
 from functools import wraps
-from itertools import chain
 from os import getenv
+from pathlib import Path
 from typing import Any, NamedTuple, TextIO
 
 import click
 
-from ._summary import maybe_write_github_summaries, maybe_write_header, maybe_write_misc
-from .github import Github
-from .models import GithubEvent, RepositoryEvents
+from . import metrics
+from ._batch import BatchAccount, load_batch_config
+from ._dump import read_dump, write_dump
+from ._pipeline import fetch_events, fetch_events_by_day, group_by_repository
+from ._summary import write_summary
+from .github import (
+    AccountCache,
+    Exclusions,
+    Github,
+    QueryProfile,
+    RecordingTransport,
+    ReplayTransport,
+    RequestScheduler,
+    ResponseCache,
+)
+from .metrics import Metrics, MetricsFormat
 from .ollama import Ollama
+from .profiling import Profiler, enable
+from .store import EventStore
 
 
 class _Context(NamedTuple):
     github: Github
     file: TextIO
-    excluded_repositories: list[str]
-    excluded_organizations: list[str]
+    exclusions: Exclusions
+    cache_dir: Path
+    scheduler: RequestScheduler
+    cache: ResponseCache | None
+    accounts: AccountCache | None
+    query_profile: QueryProfile
+    api_url: str
 
 
 def date_option(f: Callable[..., Any]) -> Callable[..., Any]:
@@ -45,6 +65,89 @@ def date_option(f: Callable[..., Any]) -> Callable[..., Any]:
     return wrapper
 
 
+def render_options(f: Callable[..., Any]) -> Callable[..., Any]:
+    """Options shared by the commands rendering summaries."""
+
+    options = (
+        click.option(
+            "--ollama-model",
+            type=str,
+            required=True,
+            show_default=True,
+            default="mistral",
+        ),
+        click.option(
+            "--ollama/--no-ollama",
+            is_flag=True,
+            default=True,
+            show_default=True,
+            help="Enable/Disable Ollama summary generation",
+        ),
+        click.option(
+            "--escape",
+            is_flag=True,
+            show_default=True,
+            help="Escape backticks. Needed for posting summary as a Github issue",
+        ),
+        click.option(
+            "--ollama-url",
+            default="http://localhost:11434",
+            type=str,
+            show_default=True,
+            help="Use custom Ollama URL.",
+        ),
+    )
+    for option in reversed(options):
+        f = option(f)
+
+    return f
+
+
+def fetch_options(f: Callable[..., Any]) -> Callable[..., Any]:
+    """Options shared by the commands fetching events."""
+
+    options = (
+        click.option(
+            "-y",
+            "--yesterday",
+            is_flag=True,
+            show_default=True,
+            help="Create daily summary for yesterday",
+        ),
+        click.option(
+            "--store/--no-store",
+            "use_store",
+            default=True,
+            show_default=True,
+            help="Keep fetched events in a local store, so days that were already "
+            "synced are not fetched again",
+        ),
+        click.option(
+            "--combine-queries/--separate-queries",
+            default=True,
+            show_default=True,
+            help="Request issues, reviews, comments and tags in a single GraphQL query",
+        ),
+        click.option(
+            "--contributions/--search",
+            default=False,
+            show_default=True,
+            help="Fetch issues, pull requests and reviews from the contributions "
+            "collection of the user, instead of searching for them",
+        ),
+    )
+    for option in reversed(options):
+        f = option(f)
+
+    return f
+
+
+def summary_options(f: Callable[..., Any]) -> Callable[..., Any]:
+    """Options shared by the commands writing summaries."""
+
+    return render_options(fetch_options(f))
+
+
 def coro(f: Callable[..., Any]) -> Callable[..., Any]:
     @wraps(f)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -101,6 +204,107 @@ def validate_repository_names(
     help="Exclude organizations from the generated summary. Expects 'organization'",
     multiple=True,
 )
+@click.option(
+    "--max-concurrency",
+    help="Maximum number of in-flight requests to Github",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+)
+@click.option(
+    "--max-connections",
+    help="Maximum number of pooled connections to Github",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+)
+@click.option(
+    "--max-keepalive-connections",
+    help="Maximum number of idle connections kept alive",
+    type=click.IntRange(min=0),
+    default=8,
+    show_default=True,
+)
+@click.option(
+    "--keepalive-expiry",
+    help="Seconds an idle connection is kept alive",
+    type=click.FloatRange(min=0),
+    default=30.0,
+    show_default=True,
+)
+@click.option(
+    "--cache/--no-cache",
+    help="Enable/Disable the on-disk cache of Github responses",
+    default=True,
+    show_default=True,
+)
+@click.option(
+    "--cache-dir",
+    help="Directory to store cached Github responses",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=Path(getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "daily-summary",
+    show_default=True,
+)
+@click.option(
+    "--cache-max-size",
+    help="Maximum size of the response cache, in MiB",
+    type=click.IntRange(min=1),
+    default=64,
+    show_default=True,
+)
+@click.option(
+    "--query-profile",
+    help="Fields to request from Github. 'minimal' only requests the fields "
+    "rendered in summaries, 'full' also requests bodies and tag authors",
+    type=click.Choice(QueryProfile, case_sensitive=False),
+    default=QueryProfile.MINIMAL.value,
+    show_default=True,
+)
+@click.option(
+    "--api-url",
+    help="Base URL of the Github API, such as a Github Enterprise server or a "
+    "local stand-in",
+    default="https://api.github.com",
+    show_default=True,
+)
+@click.option(
+    "--record",
+    help="Record every exchange with Github to this directory",
+    type=click.Path(file_okay=False, path_type=Path),
+)
+@click.option(
+    "--replay",
+    help="Replay the exchanges recorded to this directory, instead of requesting "
+    "Github",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.option(
+    "--profile",
+    help="Time each phase of the run and track its peak memory, writing the "
+    "report to this JSON file and as a table to stderr",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+)
+@click.option(
+    "--trace-allocations",
+    is_flag=True,
+    help="Report the peak memory allocated by Python when profiling, rather "
+    "than the peak resident size. Slows down the run",
+)
+@click.option(
+    "--metrics",
+    "metrics_file",
+    help="Count the requests, retries, bytes and rate limit points used by the "
+    "run, writing them to this file when it ends",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+)
+@click.option(
+    "--metrics-format",
+    help="Format of the metrics file. 'prometheus' is read by node-exporter's "
+    "textfile collector",
+    type=click.Choice(MetricsFormat, case_sensitive=False),
+    default=MetricsFormat.PROMETHEUS.value,
+    show_default=True,
+)
 @click.pass_context
 def cli(
     ctx: click.Context,
@@ -109,28 +313,120 @@ def cli(
     file: TextIO,
     exclude_repositories: tuple[str],
     exclude_organizations: tuple[str],
+    max_concurrency: int,
+    max_connections: int,
+    max_keepalive_connections: int,
+    keepalive_expiry: float,
+    cache: bool,
+    cache_dir: Path,
+    cache_max_size: int,
+    query_profile: QueryProfile,
+    api_url: str,
+    record: Path | None,
+    replay: Path | None,
+    profile: Path | None,
+    trace_allocations: bool,
+    metrics_file: Path | None,
+    metrics_format: MetricsFormat,
 ) -> None:
+    if record and replay:
+        raise click.BadParameter(
+            "can't be combined with --replay", param_hint="--record"
+        )
+
+    scheduler = RequestScheduler(
+        max_in_flight=max_concurrency,
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    if record:
+        scheduler.transport = scheduler.atransport = RecordingTransport(
+            record, scheduler.transport, scheduler.atransport
+        )
+    elif replay:
+        scheduler.transport = scheduler.atransport = ReplayTransport(replay)
+
+    # Recordings hold every exchange of a run, so none is answered from caches
+    # that the replaying run may not have.
+    cache = cache and not (record or replay)
+    response_cache = (
+        ResponseCache(cache_dir / "http", max_bytes=cache_max_size * 1024 * 1024)
+        if cache
+        else None
+    )
+    accounts = AccountCache(cache_dir / "accounts") if cache else None
+
+    if profile:
+        ctx.call_on_close(_profile(profile, trace_allocations))
+    if metrics_file:
+        recorder = Metrics()
+        metrics.use(recorder)
+        ctx.call_on_close(lambda: recorder.write(metrics_file, metrics_format))
+
     ctx.obj = _Context(
-        github=Github(token, username=username),
+        github=Github(
+            token,
+            username=username,
+            scheduler=scheduler,
+            cache=response_cache,
+            profile=query_profile,
+            accounts=accounts,
+            api_url=api_url,
+        ),
         file=file,
-        excluded_repositories=list(exclude_repositories),
-        excluded_organizations=list(exclude_organizations),
+        exclusions=Exclusions(exclude_repositories, exclude_organizations),
+        cache_dir=cache_dir,
+        scheduler=scheduler,
+        cache=response_cache,
+        accounts=accounts,
+        query_profile=query_profile,
+        api_url=api_url,
     )
 
 
+def _profile(path: Path, trace_allocations: bool) -> Callable[[], None]:
+    profiler = Profiler(trace_allocations)
+    enable(profiler)
+    profiler.start()
+
+    def report() -> None:
+        profiler.stop()
+        with open(path, "w") as file:
+            profiler.write_json(file)
+        profiler.write_table(click.get_text_stream("stderr"))
+
+    return report
+
+
+@cli.result_callback()
+@click.pass_context
+def report_rate_limits(ctx: click.Context, *args: Any, **kwargs: Any) -> None:
+    context: _Context = ctx.obj
+    _echo_rate_limits(context.github)
+
+
+def _echo_rate_limits(github: Github, account: str = "") -> None:
+    if not (rate_limits := github.rate_limits):
+        return
+
+    click.echo(f"Github rate limit budget left{account}:", err=True)
+    for resource, rate_limit in sorted(rate_limits.items()):
+        click.echo(f"  {resource}: {rate_limit}", err=True)
+
+
 @cli.command()
 @date_option
 @click.pass_context
-def list_issues(ctx: click.Context, date: datetime) -> None:
+@coro
+async def list_issues(ctx: click.Context, date: datetime) -> None:
     context: _Context = ctx.obj
-    context.file.writelines(
-        [
-            f"{event}\n"
-            for event in context.github.issues_from(
-                date, context.excluded_repositories, context.excluded_organizations
-            )
-        ]
-    )
+    events = [
+        f"{event}\n"
+        async for event in context.github.issues_from(date, context.exclusions)
+    ]
+
+    context.file.writelines(events)
 
 
 @cli.command()
@@ -141,9 +437,7 @@ async def list_commits(ctx: click.Context, date: datetime) -> None:
     context: _Context = ctx.obj
     events = [
         f"{event}\n"
-        async for event in context.github.commits_from(
-            date, context.excluded_repositories, context.excluded_organizations
-        )
+        async for event in context.github.commits_from(date, context.exclusions)
     ]
 
     context.file.writelines(events)
@@ -160,69 +454,53 @@ def account(ctx: click.Context) -> None:
 @cli.command()
 @date_option
 @click.pass_context
-def list_tags(ctx: click.Context, date: datetime) -> None:
+@coro
+async def list_tags(ctx: click.Context, date: datetime) -> None:
     context: _Context = ctx.obj
-    context.file.writelines(
-        [
-            f"{event}\n"
-            for event in context.github.tags_from(
-                date, context.excluded_repositories, context.excluded_organizations
-            )
-        ]
-    )
+    events = [
+        f"{event}\n"
+        async for event in context.github.tags_from(date, context.exclusions)
+    ]
+
+    context.file.writelines(events)
 
 
 @cli.command()
 @date_option
 @click.pass_context
-def list_comments(ctx: click.Context, date: datetime) -> None:
+@coro
+async def list_comments(ctx: click.Context, date: datetime) -> None:
     context: _Context = ctx.obj
-    context.file.writelines(
-        [
-            f"{event}\n"
-            for event in context.github.comments_from(
-                date, context.excluded_repositories, context.excluded_organizations
-            )
-        ]
-    )
+    events = [
+        f"{event}\n"
+        async for event in context.github.comments_from(date, context.exclusions)
+    ]
+
+    context.file.writelines(events)
 
 
 @cli.command()
 @coro
 @date_option
+@summary_options
 @click.option(
-    "--ollama-model",
-    type=str,
-    required=True,
-    show_default=True,
-    default="mistral",
+    "--from",
+    "since",
+    type=click.DateTime(formats=("%Y-%m-%d", "%d-%m-%Y")),
+    help="Backfill summaries starting from this date, writing one file per day",
 )
 @click.option(
-    "--ollama/--no-ollama",
-    is_flag=True,
-    default=True,
-    show_default=True,
-    help="Enable/Disable Ollama summary generation",
-)
-@click.option(
-    "-y",
-    "--yesterday",
-    is_flag=True,
-    show_default=True,
-    help="Create daily summary for yesterday",
+    "--to",
+    "until",
+    type=click.DateTime(formats=("%Y-%m-%d", "%d-%m-%Y")),
+    help="Last date to backfill summaries for. Defaults to today",
 )
 @click.option(
-    "--escape",
-    is_flag=True,
-    show_default=True,
-    help="Escape backticks. Needed for posting summary as a Github issue",
-)
-@click.option(
-    "--ollama-url",
-    default="http://localhost:11434",
-    type=str,
+    "--output-dir",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    default=".",
     show_default=True,
-    help="Use custom Ollama URL.",
+    help="Directory to write backfilled summaries to, as YYYY-MM-DD.md",
 )
 @click.pass_context
 async def daily_summary(
@@ -233,49 +511,237 @@ async def daily_summary(
     yesterday: bool,
     escape: bool,
     ollama_url: str,
+    use_store: bool,
+    combine_queries: bool,
+    contributions: bool,
+    since: datetime | None,
+    until: datetime | None,
+    output_dir: Path,
 ) -> None:
     context: _Context = ctx.obj
 
-    repository_events: dict[str, list[GithubEvent]] = defaultdict(list)
+    if until and not since:
+        raise click.BadParameter("requires --from", param_hint="--to")
+    if since:
+        # Backfills are written to --output-dir, for the days of --from/--to.
+        explicit = click.core.ParameterSource.COMMANDLINE
+        for param, conflicting in (
+            ("--yesterday", yesterday),
+            ("--date", ctx.get_parameter_source("date") == explicit),
+            ("--file", ctx.find_root().get_parameter_source("file") == explicit),
+        ):
+            if conflicting:
+                raise click.BadParameter(
+                    f"can't be combined with {param}", param_hint="--from"
+                )
+
+    backfill = since is not None
+    filter_date = (datetime.now() - timedelta(days=1)) if yesterday else date
+    since, until = (since, until or datetime.now()) if since else (filter_date,) * 2
+    if since > until:
+        raise click.BadParameter("must not be after --to", param_hint="--from")
+
+    store = EventStore(context.cache_dir / "events.sqlite3") if use_store else None
+    days, account = await asyncio.gather(
+        fetch_events_by_day(
+            context.github,
+            since,
+            until,
+            context.exclusions,
+            store=store,
+            combine_queries=combine_queries,
+            contributions=contributions,
+        ),
+        asyncio.to_thread(context.github.get_user),
+    )
+
+    ollama_handler = Ollama(host=ollama_url, model=ollama_model) if ollama else None
+
+    if not backfill:
+        events = group_by_repository(days[since.date()])
+        write_summary(account, events, ollama_handler, context.file, since, escape)
+        return
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for day, fetched in days.items():
+        if not fetched:
+            continue
+
+        with open(output_dir / f"{day:%Y-%m-%d}.md", "w") as file:
+            events = group_by_repository(fetched)
+            write_summary(account, events, ollama_handler, file, day, escape)
+
+
+@cli.command()
+@coro
+@date_option
+@fetch_options
+@click.pass_context
+async def fetch(
+    ctx: click.Context,
+    date: datetime,
+    yesterday: bool,
+    use_store: bool,
+    combine_queries: bool,
+    contributions: bool,
+) -> None:
+    """Write the events of a day as JSON lines, to be rendered by `render`."""
+
+    context: _Context = ctx.obj
 
     filter_date = (datetime.now() - timedelta(days=1)) if yesterday else date
 
-    for event in chain(
-        context.github.issues_from(
-            filter_date, context.excluded_repositories, context.excluded_organizations
-        ),
-        [
-            event
-            async for event in context.github.commits_from(
-                filter_date,
-                context.excluded_repositories,
-                context.excluded_organizations,
-            )
-        ],
-        context.github.reviews_from(
-            filter_date, context.excluded_repositories, context.excluded_organizations
-        ),
-        context.github.tags_from(
-            filter_date, context.excluded_repositories, context.excluded_organizations
-        ),
-        context.github.comments_from(
-            filter_date, context.excluded_repositories, context.excluded_organizations
+    store = EventStore(context.cache_dir / "events.sqlite3") if use_store else None
+    fetched, account = await asyncio.gather(
+        fetch_events(
+            context.github,
+            filter_date,
+            context.exclusions,
+            store=store,
+            combine_queries=combine_queries,
+            contributions=contributions,
         ),
-    ):
-        repository_events[str(event.repository)].append(event)
+        asyncio.to_thread(context.github.get_user),
+    )
 
-    events = [
-        RepositoryEvents(
-            repository=evts[0].repository.name,
-            organization=evts[0].repository.owner,
-            events=evts,
+    write_dump(context.file, account, filter_date.date(), group_by_repository(fetched))
+
+
+@cli.command()
+@click.argument("dump", type=click.File("r"))
+@render_options
+@click.pass_context
+def render(
+    ctx: click.Context,
+    dump: TextIO,
+    ollama_model: str,
+    ollama: bool,
+    escape: bool,
+    ollama_url: str,
+) -> None:
+    """Write the summary of a DUMP of events written by `fetch`."""
+
+    context: _Context = ctx.obj
+
+    try:
+        account, date, repository_events = read_dump(dump)
+        events = list(repository_events)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), param_hint="DUMP") from exc
+
+    ollama_handler = Ollama(host=ollama_url, model=ollama_model) if ollama else None
+    write_summary(account, events, ollama_handler, context.file, date, escape)
+
+
+@cli.command()
+@coro
+@click.argument("config", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@date_option
+@summary_options
+@click.pass_context
+async def batch(
+    ctx: click.Context,
+    config: Path,
+    date: datetime,
+    ollama_model: str,
+    ollama: bool,
+    yesterday: bool,
+    escape: bool,
+    ollama_url: str,
+    use_store: bool,
+    combine_queries: bool,
+    contributions: bool,
+) -> None:
+    """Write the summary of every account listed in the CONFIG file."""
+
+    context: _Context = ctx.obj
+
+    try:
+        accounts = load_batch_config(config).accounts
+    except (ValueError, tomllib.TOMLDecodeError) as exc:
+        raise click.BadParameter(str(exc), param_hint="CONFIG") from exc
+
+    if missing := [acc.token_env for acc in accounts if not acc.token]:
+        raise click.UsageError(f"Missing tokens in environment: {', '.join(missing)}")
+
+    filter_date = (datetime.now() - timedelta(days=1)) if yesterday else date
+
+    store = EventStore(context.cache_dir / "events.sqlite3") if use_store else None
+    ollama_handler = Ollama(host=ollama_url, model=ollama_model) if ollama else None
+
+    # Accounts only share the scheduler and caches, so their requests count
+    # against the same concurrency cap and connection pool.
+    githubs = [
+        Github(
+            batch_account.token or "",
+            username=batch_account.username,
+            scheduler=context.scheduler,
+            cache=context.cache,
+            profile=context.query_profile,
+            accounts=context.accounts,
+            api_url=context.api_url,
         )
-        for evts in repository_events.values()
+        for batch_account in accounts
     ]
 
-    ollama_handler = Ollama(host=ollama_url, model=ollama_model) if ollama else None
-    account = context.github.get_user()
+    async def summarize(batch_account: BatchAccount, github: Github) -> None:
+        fetched, account = await asyncio.gather(
+            fetch_events(
+                github,
+                filter_date,
+                Exclusions(
+                    batch_account.exclude_repositories,
+                    batch_account.exclude_organizations,
+                ),
+                store=store,
+                combine_queries=combine_queries,
+                contributions=contributions,
+            ),
+            asyncio.to_thread(github.get_user),
+        )
+
+        def write() -> None:
+            batch_account.output.parent.mkdir(parents=True, exist_ok=True)
+            with open(batch_account.output, "w") as file:
+                write_summary(
+                    account,
+                    group_by_repository(fetched),
+                    ollama_handler,
+                    file,
+                    filter_date,
+                    escape,
+                )
+
+        # Summarizing with Ollama blocks, so keep it off the event loop while
+        # other accounts are still fetching.
+        await asyncio.to_thread(write)
+
+    # Accounts fail on their own, such as on an expired token, without
+    # cancelling the summaries of the others.
+    results = await asyncio.gather(
+        *map(summarize, accounts, githubs),
+        return_exceptions=True,
+    )
+
+    # Each token has its own budget.
+    for batch_account, github in zip(accounts, githubs, strict=True):
+        _echo_rate_limits(
+            github, f" for {batch_account.username} ({batch_account.token_env})"
+        )
+
+    failed = 0
+    for batch_account, result in zip(accounts, results, strict=True):
+        if not isinstance(result, BaseException):
+            continue
+        if not isinstance(result, Exception):
+            raise result
+
+        failed += 1
+        click.echo(
+            f"Failed to summarize {batch_account.username} "
+            f"({batch_account.token_env}): {result!r}",
+            err=True,
+        )
 
-    maybe_write_header(account, events, context.file, filter_date, escape)
-    maybe_write_github_summaries(events, ollama_handler, context.file, escape)
-    maybe_write_misc(events, context.file)
+    if failed:
+        raise click.ClickException(f"{failed} of {len(accounts)} accounts failed")
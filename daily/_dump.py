@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 21:05>
+
+import datetime
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple, TextIO
+
+from pydantic import BaseModel
+
+from .models import Account, RepositoryEvents
+
+
+class DumpHeader(BaseModel):
+    """First line of a dump, naming whose events of which day follow."""
+
+    account: Account
+    date: datetime.date
+
+
+class Dump(NamedTuple):
+    account: Account
+    date: datetime.date
+    events: Iterator[RepositoryEvents]
+
+
+def write_dump(
+    file: TextIO,
+    account: Account,
+    date: datetime.date,
+    repository_events: Iterable[RepositoryEvents],
+) -> None:
+    """
+    Write fetched events as JSON lines: a `DumpHeader`, then one line per
+    repository, so dumps are written and read back a record at a time.
+    """
+
+    header = DumpHeader(account=account, date=date)
+    file.write(header.model_dump_json(by_alias=True) + "\n")
+    file.writelines(
+        events.model_dump_json(exclude_none=True) + "\n" for events in repository_events
+    )
+
+
+def read_dump(file: TextIO) -> Dump:
+    """Read the header of a dump, leaving its repositories to be read lazily."""
+
+    if not (line := file.readline()):
+        raise ValueError("Expected a header on the first line of the dump")
+    header = DumpHeader.model_validate_json(line)
+
+    return Dump(header.account, header.date, _read_repository_events(file))
+
+
+def _read_repository_events(file: TextIO) -> Iterator[RepositoryEvents]:
+    for line in file:
+        if line.strip():
+            yield RepositoryEvents.model_validate_json(line)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 13:34>
+
+import asyncio
+import hashlib
+from collections import defaultdict
+from collections.abc import AsyncIterable, Callable, Iterable
+from datetime import UTC, date, datetime, time, timedelta
+from itertools import chain
+
+from .github import Exclusions, Github
+from .models import (
+    Event,
+    EventSource,
+    EventTable,
+    EventType,
+    GithubEvent,
+    RepositoryEvents,
+)
+from .store import EventStore
+
+
+async def fetch_events(
+    github: Github,
+    date: datetime,
+    exclusions: Exclusions,
+    store: EventStore | None = None,
+    combine_queries: bool = True,
+    contributions: bool = False,
+) -> EventTable:
+    """Fetch the events of every source on `date`, all at once."""
+
+    days = await fetch_events_by_day(
+        github,
+        date,
+        date,
+        exclusions,
+        store=store,
+        combine_queries=combine_queries,
+        contributions=contributions,
+    )
+    return days[date.date()]
+
+
+async def fetch_events_by_day(
+    github: Github,
+    since: datetime,
+    until: datetime,
+    exclusions: Exclusions,
+    store: EventStore | None = None,
+    combine_queries: bool = True,
+    contributions: bool = False,
+) -> dict[date, EventTable]:
+    """
+    Fetch the events of every source from `since` to `until`, bucketed per day.
+
+    Sources already synced for a day in `store` are read from it instead of
+    Github, and freshly fetched sources are saved back to it day by day. The
+    days a source still misses are fetched at once, with date range qualifiers.
+    With `combine_queries`, the first page of every GraphQL source is requested
+    in a single round trip. With `contributions`, issues, pull requests and
+    reviews come from the user's contributions collection instead of searches.
+    Days are held in `EventTable`s, so long ranges stay small in memory.
+    """
+
+    days = day_range(since.date(), until.date())
+    scope = store_scope(github, exclusions)
+    sources: dict[EventSource, Callable[..., AsyncIterable[GithubEvent]]] = {
+        EventSource.ISSUES: github.issues_from,
+        EventSource.COMMITS: github.commits_from,
+        EventSource.REVIEWS: github.reviews_from,
+        EventSource.TAGS: github.tags_from,
+        EventSource.COMMENTS: github.comments_from,
+    }
+    if contributions:
+        del sources[EventSource.ISSUES], sources[EventSource.REVIEWS]
+        sources = {EventSource.CONTRIBUTIONS: github.contributions_from} | sources
+    pending = {
+        source: [
+            day for day in days if not (store and store.is_synced(scope, source, day))
+        ]
+        for source in sources
+    }
+
+    if combine_queries:
+        spans: dict[tuple[date, date], list[EventSource]] = defaultdict(list)
+        for source, missing in pending.items():
+            if missing:
+                spans[(missing[0], missing[-1])].append(source)
+
+        for (first, last), span_sources in spans.items():
+            github.prefetch(_start_of(first), span_sources, exclusions, _start_of(last))
+
+    async def fetch(
+        source: EventSource,
+        events_from: Callable[..., AsyncIterable[GithubEvent]],
+    ) -> dict[date, list[GithubEvent]]:
+        # Only sources that are synced in `store` have no missing days.
+        if not (missing := pending[source]):
+            return {day: store.events(scope, day, source=source) for day in days}
+
+        # Fetch the whole span of missing days in one go, even if some days in
+        # between were synced already.
+        first, last = missing[0], missing[-1]
+        fetched = events_by_day(
+            await collect(
+                events_from(
+                    _start_of(first),
+                    exclusions,
+                    _start_of(last),
+                )
+            ),
+            first,
+            last,
+        )
+
+        if store:
+            for day in day_range(first, last):
+                store.save(scope, source, day, fetched.get(day, []))
+
+        return {
+            day: fetched.get(day, [])
+            if first <= day <= last
+            else store.events(scope, day, source=source)
+            for day in days
+        }
+
+    # Every source is independent from the others, so fetch them all at once and
+    # keep the original ordering when grouping by repository.
+    sources_days = await asyncio.gather(
+        *(fetch(source, events_from) for source, events_from in sources.items())
+    )
+
+    return {
+        day: EventTable(
+            chain.from_iterable(source_days[day] for source_days in sources_days)
+        )
+        for day in days
+    }
+
+
+def events_by_day(
+    events: list[GithubEvent], since: date, until: date
+) -> dict[date, list[GithubEvent]]:
+    """
+    Bucket events by the day they happened on, in their original order.
+
+    Events Github matched just outside of `since` and `until`, such as commits
+    dated in another timezone, are kept on the nearest day of the window.
+    """
+
+    days: dict[date, list[GithubEvent]] = defaultdict(list)
+
+    for event in events:
+        # Reviews are yielded once per day they were reviewed on.
+        happened_at = (
+            event.updated_at
+            if event.event_type == EventType.REVIEW and event.updated_at
+            else event.created_at
+        )
+        days[min(max(happened_at.date(), since), until)].append(event)
+
+    return dict(days)
+
+
+def day_range(since: date, until: date) -> list[date]:
+    return [since + timedelta(days=n) for n in range((until - since).days + 1)]
+
+
+def group_by_repository(events: Iterable[Event]) -> list[RepositoryEvents]:
+    repository_events: dict[str, list[Event]] = defaultdict(list)
+
+    for event in events:
+        repository_events[str(event.repository)].append(event)
+
+    return [
+        RepositoryEvents(
+            repository=evts[0].repository.name,
+            organization=evts[0].repository.owner,
+            events=evts,
+        )
+        for evts in repository_events.values()
+    ]
+
+
+def store_scope(
+    github: Github,
+    exclusions: Exclusions,
+) -> str:
+    """
+    Identify stored events by token, username, query profile and exclusions.
+
+    Profiles select different fields, so events fetched with a leaner one are
+    never served to a run asking for more.
+    """
+
+    key = "\0".join(
+        (
+            github.fingerprint,
+            github.username,
+            github.profile.value,
+            *sorted(exclusions.repositories),
+            "",
+            *sorted(exclusions.organizations),
+        )
+    )
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+async def collect(events: AsyncIterable[GithubEvent]) -> list[GithubEvent]:
+    return [event async for event in events]
+
+
+def _start_of(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=UTC)
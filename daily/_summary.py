@@ -6,13 +6,29 @@
 import datetime
 import re
 from collections import defaultdict
-from functools import partial
+from collections.abc import Sequence
+from functools import lru_cache, partial
 from typing import TextIO
 
-from .models import Account, EventType, GithubEvent, RepositoryEvents, Summary
+from .models import Account, Event, EventType, RepositoryEvents
 from .ollama import Ollama
+from .profiling import profiled
 
 
+def write_summary(
+    account: Account,
+    events: list[RepositoryEvents],
+    ollama: Ollama | None,
+    file: TextIO,
+    date: datetime.date,
+    escape: bool = False,
+) -> None:
+    maybe_write_header(account, events, file, date, escape)
+    maybe_write_github_summaries(events, ollama, file, escape)
+    maybe_write_misc(events, file)
+
+
+@profiled("maybe_write_header")
 def maybe_write_header(
     account: Account,
     events: list[RepositoryEvents],
@@ -32,6 +48,7 @@ def maybe_write_header(
     )
 
 
+@profiled("maybe_write_github_summaries")
 def maybe_write_github_summaries(
     repository_events: list[RepositoryEvents],
     ollama: Ollama | None,
@@ -50,7 +67,7 @@ def maybe_write_github_summaries(
     for title, event_types in sections:
         summary(
             title=title,
-            repository_events=_order_by_org_event_type(repository_events, event_types),
+            repository_events=order_by_org_event_type(repository_events, event_types),
         )
 
     for title, committed_by_others in (
@@ -59,7 +76,7 @@ def maybe_write_github_summaries(
     ):
         summary(
             title=title,
-            repository_events=_order_by_org_event_type(
+            repository_events=order_by_org_event_type(
                 repository_events,
                 (EventType.COMMIT,),
                 committed_by_others=committed_by_others,
@@ -67,6 +84,7 @@ def maybe_write_github_summaries(
         )
 
 
+@profiled("maybe_write_misc")
 def maybe_write_misc(events: list[RepositoryEvents], file: TextIO) -> None:
     if not events:
         return
@@ -89,7 +107,7 @@ def _maybe_summarize(content: str, ollama: Ollama | None) -> str:
 
 def _write_repository_section(
     repository: str,
-    events: list[GithubEvent],
+    events: Sequence[Event],
     ollama: Ollama | None,
     file: TextIO,
     escape: bool = False,
@@ -100,26 +118,39 @@ def _write_repository_section(
 
 
 def _write_events(
-    events: list[GithubEvent],
+    events: Sequence[Event],
     ollama: Ollama | None,
     file: TextIO,
     escape: bool = False,
 ) -> None:
+    # Read the few fields a line needs straight off the event, rather than
+    # building a `Summary` for each.
     for evt in events:
-        summary = Summary.from_event(evt)
-        summarized_title = _maybe_summarize(summary.title, ollama)
-        state_suffix = f"/ [{summary.state}]\n" if summary.state else "\n"
+        summarized_title = _maybe_summarize(_first_line(evt.title), ollama)
+        state_suffix = f"/ [{_title_case(evt.state)}]\n" if evt.state else "\n"
 
         file.write(
             _maybe_escape_str(f"  - {summarized_title} ", escape)
-            + f"[[{summary.event_type.value}]({summary.event_url})] "
+            + f"[[{evt.event_type.value}]({evt.url.strip()})] "
             f"{state_suffix}"
         )
 
 
+@lru_cache(maxsize=4096)
+def _first_line(title: str) -> str:
+    # Reviews and comments of the same pull request share its title.
+    lines = title.strip().splitlines()
+    return lines[0] if lines else ""
+
+
+@lru_cache(maxsize=32)
+def _title_case(state: str) -> str:
+    return state.title()
+
+
 def _maybe_write_summary(
     title: str,
-    repository_events: defaultdict[str, defaultdict[str, list[GithubEvent]]],
+    repository_events: defaultdict[str, defaultdict[str, list[Event]]],
     ollama: Ollama | None,
     file: TextIO,
     escape: bool = False,
@@ -140,11 +171,11 @@ def _maybe_write_summary(
             _write_repository_section(repository, events, ollama, file, escape)
 
 
-def _order_by_org_event_type(
+def order_by_org_event_type(
     repository_events: list[RepositoryEvents],
     event_types: tuple[EventType, ...],
     committed_by_others: bool | None = None,
-) -> defaultdict[str, defaultdict[str, list[GithubEvent]]]:
+) -> defaultdict[str, defaultdict[str, list[Event]]]:
     """
     Order and filter repository events by organization and repository.
 
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 22:40>
+
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Callable
+from functools import wraps
+from typing import ParamSpec, TypeVar
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+def wrap_iterable(
+    around: Callable[[AsyncIterable[T]], AsyncGenerator[T, None]],
+) -> Callable[[Callable[P, AsyncIterable[T]]], Callable[P, AsyncIterable[T]]]:
+    """
+    Decorate functions returning an async iterable with `around`, a generator
+    re-yielding its items.
+
+    Both are closed along with the decorated iterable, so a source stops
+    fetching as soon as its consumer stops iterating.
+    """
+
+    def decorator(f: Callable[P, AsyncIterable[T]]) -> Callable[P, AsyncIterable[T]]:
+        @wraps(f)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> AsyncIterator[T]:
+            iterable = f(*args, **kwargs)
+            wrapped = around(iterable)
+            try:
+                async for item in wrapped:
+                    yield item
+            finally:
+                await wrapped.aclose()
+                if isinstance(iterable, AsyncGenerator):
+                    await iterable.aclose()
+
+        return wrapper
+
+    return decorator
@@ -6,3 +6,6 @@ class DailySummaryError(Exception): ...
 
 
 class DailySummaryUnauthorizedError(DailySummaryError): ...
+
+
+class DailySummaryQueryError(DailySummaryError): ...
@@ -3,6 +3,19 @@
 # Author: Ben Mezger <me@benmezger.nl>
 # Created at <2025-03-15 Sat 17:23>
 
-from ._github import Github
+from ._cache import AccountCache, ResponseCache
+from ._exclusions import Exclusions
+from ._github import Github, QueryProfile
+from ._replay import RecordingTransport, ReplayTransport
+from ._scheduler import RequestScheduler
 
-__all__ = ["Github"]
+__all__ = [
+    "AccountCache",
+    "Exclusions",
+    "Github",
+    "QueryProfile",
+    "RecordingTransport",
+    "ReplayTransport",
+    "RequestScheduler",
+    "ResponseCache",
+]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 12:31>
+
+import hashlib
+import json
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+import httpx
+
+from daily.models import Account
+
+# Response headers worth keeping around for replaying a cached response.
+_KEPT_HEADERS = ("content-type", "etag", "last-modified", "link")
+# Share of `max_bytes` left after evicting, so puts right after an eviction
+# don't scan the cache again.
+_LOW_WATER = 0.9
+
+
+class CachedResponse(NamedTuple):
+    headers: dict[str, str]
+    content: bytes
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if etag := self.headers.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := self.headers.get("last-modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, headers=self.headers, content=self.content, request=request
+        )
+
+
+class ResponseCache:
+    """
+    On-disk cache of GET responses, revalidated with ETag/Last-Modified.
+
+    Each entry is a single file named after the hash of its key. Reading an
+    entry bumps its modification time, and once the cache grows past
+    `max_bytes` the least recently used entries are evicted, down to 90% of it.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        self._size: int | None = None
+
+    def get(self, key: str) -> CachedResponse | None:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_bytes())
+            path.touch()
+        except (OSError, ValueError):
+            return None
+
+        return CachedResponse(
+            headers=entry["headers"], content=entry["content"].encode()
+        )
+
+    def put(self, key: str, response: httpx.Response) -> None:
+        headers = {
+            name: value
+            for name in _KEPT_HEADERS
+            if (value := response.headers.get(name)) is not None
+        }
+        if "etag" not in headers and "last-modified" not in headers:
+            return
+
+        data = json.dumps({"headers": headers, "content": response.text}).encode()
+
+        path = self._path(key)
+        size = self.size() - (path.stat().st_size if path.exists() else 0)
+
+        # Write to a temporary file first so readers never see a partial entry.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+        self._size = size + len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def size(self) -> int:
+        if self._size is None:
+            self._size = sum(path.stat().st_size for path in self._entries())
+        return self._size
+
+    def _evict(self) -> None:
+        stats = []
+        for path in self._entries():
+            try:
+                stats.append((path.stat(), path))
+            except OSError:
+                continue
+
+        size = sum(stat.st_size for stat, _ in stats)
+        for stat, path in sorted(stats, key=lambda entry: entry[0].st_mtime):
+            if size <= self.max_bytes * _LOW_WATER:
+                break
+
+            size -= stat.st_size
+            path.unlink(missing_ok=True)
+
+        self._size = size
+
+    def _entries(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+        return list(self.directory.glob("*.json"))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+
+class AccountCache:
+    """
+    On-disk cache of the account behind each token, for `ttl`.
+
+    Entries are keyed by token fingerprint, so the token itself is never
+    stored.
+    """
+
+    def __init__(self, directory: Path, ttl: timedelta = timedelta(days=1)) -> None:
+        self.directory = directory
+        self.ttl = ttl
+
+    def get(self, fingerprint: str) -> Account | None:
+        path = self._path(fingerprint)
+        try:
+            age = time.time() - path.stat().st_mtime
+            if age > self.ttl.total_seconds():
+                return None
+            return Account.model_validate_json(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, fingerprint: str, account: Account) -> None:
+        path = self._path(fingerprint)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(account.model_dump_json(by_alias=True))
+        tmp.replace(path)
+
+    def _path(self, fingerprint: str) -> Path:
+        return self.directory / f"{fingerprint}.json"
+
+
+def token_fingerprint(access_token: str) -> str:
+    """Stable, non-reversible identifier of a token, for namespacing caches."""
+
+    return hashlib.sha256(access_token.encode()).hexdigest()[:16]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 16:05>
+
+import fnmatch
+import re
+from collections.abc import Iterable
+
+_GLOB_CHARACTERS = frozenset("*?[")
+
+
+class Exclusions:
+    """
+    Repositories and organizations left out of summaries.
+
+    Repositories are given as `owner/name` and organizations by their login,
+    case-insensitively. Either may be a glob pattern, such as `acme/*-infra`.
+    Literal entries are handed to Github as search qualifiers, so excluded
+    events aren't fetched at all, while patterns are only matched locally.
+    Searches rejecting the qualifiers, such as for a renamed repository, fall
+    back to matching every entry locally.
+    """
+
+    def __init__(
+        self, repositories: Iterable[str] = (), organizations: Iterable[str] = ()
+    ) -> None:
+        self.repositories = frozenset(name.lower() for name in repositories)
+        self.organizations = frozenset(name.lower() for name in organizations)
+
+        self._repositories = _literals(self.repositories)
+        self._organizations = _literals(self.organizations)
+        self._repository_patterns = _compile(self.repositories)
+        self._organization_patterns = _compile(self.organizations)
+
+    def __bool__(self) -> bool:
+        return bool(self.repositories or self.organizations)
+
+    def excludes(self, name_with_owner: str) -> bool:
+        name_with_owner = name_with_owner.lower()
+        owner = name_with_owner.partition("/")[0]
+
+        return (
+            owner in self._organizations
+            or name_with_owner in self._repositories
+            or bool(
+                self._organization_patterns and self._organization_patterns.match(owner)
+            )
+            or bool(
+                self._repository_patterns
+                and self._repository_patterns.match(name_with_owner)
+            )
+        )
+
+    def qualifiers(self, max_length: int) -> list[str]:
+        """
+        Search qualifiers excluding the literal entries, in `max_length` at most.
+
+        Github rejects long search queries, so entries that don't fit are left
+        to `excludes`.
+        """
+
+        qualifiers = []
+        length = 0
+
+        for qualifier in (
+            *(f"-org:{name}" for name in sorted(self._organizations)),
+            *(f"-repo:{name}" for name in sorted(self._repositories)),
+        ):
+            # Qualifiers are separated from each other and the query by a space.
+            length += len(qualifier) + 1
+            if length > max_length:
+                break
+            qualifiers.append(qualifier)
+
+        return qualifiers
+
+
+def _literals(names: frozenset[str]) -> frozenset[str]:
+    return frozenset(name for name in names if _GLOB_CHARACTERS.isdisjoint(name))
+
+
+def _compile(names: frozenset[str]) -> re.Pattern[str] | None:
+    patterns = sorted(names - _literals(names))
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
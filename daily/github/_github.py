@@ -5,9 +5,18 @@
 
 
 import asyncio
-from collections.abc import AsyncIterable, Iterable
-from datetime import datetime
+import json
+import warnings
+from collections.abc import (
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+)
+from datetime import UTC, date, datetime, time, timedelta
 from http import HTTPStatus
+from time import perf_counter
 from typing import Any, Literal, overload
 
 import httpx
@@ -15,219 +24,528 @@ import pydash
 import tenacity
 from httpx import AsyncClient, Client
 
-from daily.exceptions import DailySummaryUnauthorizedError
-from daily.models import Account, GithubEvent
+from daily import metrics
+from daily.exceptions import (
+    DailySummaryError,
+    DailySummaryQueryError,
+    DailySummaryUnauthorizedError,
+)
+from daily.models import Account, EventSource, GithubEvent, validate_events
+from daily.profiling import profiled_iterable, span
 
 from . import _graphql_queries as queries
+from ._cache import AccountCache, CachedResponse, ResponseCache, token_fingerprint
+from ._exclusions import Exclusions
+from ._graphql_queries import QueryProfile
+from ._rate_limit import RateLimit, RateLimitGovernor
+from ._scheduler import RequestScheduler
+
+# Longest range of days, less one, of a single contributions collection.
+_CONTRIBUTIONS_WINDOW = timedelta(days=364)
+# How long before the requested days a tagged commit may have been made.
+_TAG_LOOKBACK = timedelta(days=7)
+
+
+def _endpoint(api_url: str, url: str) -> str:
+    # Label by route rather than by path, so every repository doesn't get its own
+    # series.
+    path = httpx.URL(url).path.removeprefix(httpx.URL(api_url).path.rstrip("/"))
+    segments = path.strip("/").split("/")
+    if segments[0] == "repos" and len(segments) > 3:
+        return "/repos/{owner}/{repo}/" + segments[3]
+    return path
+
+
+def _count_retry(retry_state: tenacity.RetryCallState) -> None:
+    if not (recorder := metrics.current()):
+        return
+
+    github, _, url = retry_state.args[:3]
+    recorder.inc(
+        "retries_total",
+        service="github",
+        source=metrics.source(),
+        endpoint=_endpoint(github.api_url, url),
+    )
+
+
+def _rejected(retry_state: tenacity.RetryCallState) -> bool:
+    # Requests Github rejected fail the same way again, unless rate limited.
+    exception = retry_state.outcome and retry_state.outcome.exception()
+    return (
+        isinstance(exception, httpx.HTTPStatusError)
+        and exception.response.is_client_error
+        and exception.response.status_code
+        not in (HTTPStatus.FORBIDDEN, HTTPStatus.TOO_MANY_REQUESTS)
+    )
 
 
 class Github:
-    def __init__(self, access_token: str, username: str) -> None:
+    def __init__(
+        self,
+        access_token: str,
+        username: str,
+        scheduler: RequestScheduler | None = None,
+        cache: ResponseCache | None = None,
+        profile: QueryProfile = QueryProfile.MINIMAL,
+        accounts: AccountCache | None = None,
+        api_url: str = "https://api.github.com",
+    ) -> None:
+        self.api_url = api_url.rstrip("/")
+        self._scheduler = scheduler or RequestScheduler()
+        self._cache = cache
+        self._accounts = accounts
+        self.fingerprint = token_fingerprint(access_token)
+
         self._client = Client(
             headers={
                 "Authorization": f"Bearer {access_token}",
                 "Content-Type": "application/json",
-            }
+            },
+            transport=self._scheduler.transport,
         )
 
         self._aclient = AsyncClient(
             headers={
                 "Authorization": f"Bearer {access_token}",
                 "Content-Type": "application/json",
-            }
+            },
+            transport=self._scheduler.atransport,
         )
 
+        self._rate_limits = RateLimitGovernor()
+        self.profile = profile
+        self._profile_fields = queries.profile_fields[profile]
+
         self.username = username
         self._account: Account | None = None
 
+        self._prefetched: dict[
+            tuple[EventSource, date, date], asyncio.Future[dict[str, Any]]
+        ] = {}
+
+    @property
+    def rate_limits(self) -> dict[str, RateLimit]:
+        """Remaining rate limit budget per resource, as last reported by Github."""
+        return self._rate_limits.budgets
+
     def get_user(self) -> Account:
         if self._account:
             return self._account
 
-        response = self._make_request("get", "https://api.github.com/user")
-        return Account.model_validate(response.json())
+        if self._accounts and (account := self._accounts.get(self.fingerprint)):
+            self._account = account
+            return account
+
+        response = self._make_request("get", f"{self.api_url}/user")
+        self._account = Account.model_validate(response.json())
 
-    def issues_from(
+        if self._accounts:
+            self._accounts.put(self.fingerprint, self._account)
+
+        return self._account
+
+    def prefetch(
         self,
         created_at: datetime,
-        excluded_repositories: list[str],
-        excluded_organizations: list[str],
-    ) -> Iterable[GithubEvent]:
-        for event in self._make_graphql_request(
-            queries.issues.format(
-                username=self.username,
-                created_at=f"{created_at:%Y-%m-%d}",
-            ),
-            path="data.search.edges",
+        sources: Iterable[EventSource],
+        exclusions: Exclusions,
+        until: datetime | None = None,
+    ) -> None:
+        """
+        Request the first page of several GraphQL sources in a single round trip.
+
+        The first page of each source in `sources` is selected under its own alias
+        in one document. Those sources then pick their first page up from that
+        response when asked for the same days, and only request the following
+        pages on their own. Must be called from a running event loop.
+        """
+
+        until = until or created_at
+
+        sources = [source for source in sources if source in queries.combinable]
+        if len(sources) < 2:
+            return
+
+        query = queries.document(
+            *(
+                queries.aliased(source, queries.combinable[source][1])
+                for source in sources
+            )
+        )
+        # The combined query is made on behalf of several sources.
+        with metrics.labeled("prefetch"):
+            response = asyncio.ensure_future(
+                self._graphql(
+                    query.format(
+                        username=self.username,
+                        created_at=_date_range(created_at, until),
+                        updated_at=_date_range(created_at, until),
+                        exclusions=self._exclusion_qualifiers(exclusions),
+                        after="null",
+                        **self._profile_fields,
+                    )
+                )
+            )
+
+        for source in sources:
+            self._prefetched[(source, created_at.date(), until.date())] = response
+
+    @profiled_iterable("github.issues_from")
+    @metrics.sourced("issues")
+    async def issues_from(
+        self,
+        created_at: datetime,
+        exclusions: Exclusions,
+        until: datetime | None = None,
+    ) -> AsyncIterable[GithubEvent]:
+        async for event in self._search(
+            queries.issues,
+            exclusions,
+            created_at,
+            until,
+            first_page=self._prefetched_page(EventSource.ISSUES, created_at, until),
+            source=EventSource.ISSUES,
+            username=self.username,
         ):
-            if self._should_be_excluded(
-                event.repository.name, excluded_repositories, excluded_organizations
-            ):
+            if exclusions.excludes(str(event.repository)):
                 continue
 
             yield event
 
+    @profiled_iterable("github.commits_from")
+    @metrics.sourced("commits")
     async def commits_from(
         self,
         created_at: datetime,
-        excluded_repositories: list[str],
-        excluded_organizations: list[str],
+        exclusions: Exclusions,
+        until: datetime | None = None,
     ) -> AsyncIterable[GithubEvent]:
-        query = (
-            f"author:{self.username}+committer-date:{created_at:%Y-%m-%d}"
-            "+sort:committer-date"
-        )
+        qualifiers = self._exclusion_qualifiers(exclusions, separator="+")
 
-        response = self._make_request(
-            "get", f"https://api.github.com/search/commits?q={query}"
-        )
+        try:
+            items = await self._search_commits(created_at, until, qualifiers)
+        except httpx.HTTPStatusError as exc:
+            # See `_search`.
+            if (
+                not qualifiers
+                or exc.response.status_code != HTTPStatus.UNPROCESSABLE_ENTITY
+            ):
+                raise
+            items = await self._search_commits(created_at, until, "")
+
+        events = [
+            event
+            for event in _validate(items, EventSource.COMMITS)
+            if not exclusions.excludes(str(event.repository))
+        ]
 
         # Fetch extra information regarding the commits made, so we can check for
         # verified and non-verified commits.
-        commit_urls = {
-            item["node_id"]: item["url"]
-            for item in pydash.get(response.json(), "items", [])
-        }
-        commits_by_node = dict(
-            zip(
-                list(commit_urls.keys()),
-                await asyncio.gather(
-                    *(self._amake_request("get", url) for url in commit_urls.values())
-                ),
-                strict=True,
-            )
+        commit_urls = {item["node_id"]: item["url"] for item in items}
+        verified = await self._verified_commits(
+            {event.id: commit_urls[event.id] for event in events}
         )
 
-        for item in pydash.get(response.json(), "items", []):
-            event = GithubEvent.model_validate(item)
-            raw_commmit = commits_by_node[event.id].json()
-
-            if self._should_be_excluded(
-                str(event.repository), excluded_repositories, excluded_organizations
-            ):
-                continue
-
-            is_verified = pydash.get(raw_commmit, "commit.verification.verified", False)
-            if not is_verified:
+        for event in events:
+            if not verified[event.id]:
                 event.committed_by_others = True
 
             yield event
 
-    def reviews_from(
+    async def _search_commits(
+        self, since: datetime, until: datetime | None, qualifiers: str
+    ) -> list[dict[str, Any]]:
+        query = (
+            f"author:{self.username}"
+            f"+committer-date:{_date_range(since, until)}"
+            "+sort:committer-date"
+        )
+        url = f"{self.api_url}/search/commits?q={query}{qualifiers}&per_page=100"
+        response = await self._amake_request("get", url)
+
+        # See `_search`.
+        if halves := _split_search(response.json().get("total_count", 0), since, until):
+            items = await asyncio.gather(
+                *(self._search_commits(*days, qualifiers) for days in halves)
+            )
+            return [item for half in items for item in half]
+
+        items = []
+        while True:
+            items.extend(pydash.get(response.json(), "items", []))
+            if not (url := response.links.get("next", {}).get("url")):
+                return items
+            response = await self._amake_request("get", url)
+
+    @profiled_iterable("github.reviews_from")
+    @metrics.sourced("reviews")
+    async def reviews_from(
         self,
         updated_at: datetime,
-        excluded_repositories: list[str],
-        excluded_organizations: list[str],
-    ) -> Iterable[GithubEvent]:
-        for event in self._make_graphql_request(
-            queries.reviews.format(
-                username=self.username,
-                updated_at=f"{updated_at:%Y-%m-%d}",
-            ),
-            path="data.search.edges",
+        exclusions: Exclusions,
+        until: datetime | None = None,
+    ) -> AsyncIterable[GithubEvent]:
+        since, until_date = updated_at.date(), (until or updated_at).date()
+
+        async for event in self._search(
+            queries.reviews,
+            exclusions,
+            updated_at,
+            until,
+            first_page=self._prefetched_page(EventSource.REVIEWS, updated_at, until),
+            source=EventSource.REVIEWS,
+            username=self.username,
         ):
-            if self._should_be_excluded(
-                str(event.repository), excluded_repositories, excluded_organizations
-            ):
+            if exclusions.excludes(str(event.repository)):
                 continue
 
-            for review in event.reviews:
-                if review.username != self.username:
-                    continue
-                if review.updated_at.date() != updated_at.date():
-                    continue
+            for reviewed in self._reviewed_each_day(event, since, until_date):
+                yield reviewed
+
+    @profiled_iterable("github.contributions_from")
+    @metrics.sourced("contributions")
+    async def contributions_from(
+        self,
+        created_at: datetime,
+        exclusions: Exclusions,
+        until: datetime | None = None,
+    ) -> AsyncIterable[GithubEvent]:
+        """
+        Stream the issues, pull requests and reviews the user contributed.
+
+        Stands in for both `issues_from` and `reviews_from`, out of the user's
+        contributions collection. The first page of every kind of contribution
+        is requested in a single query, and only the kinds with more
+        contributions are paged on their own.
+        """
+
+        since, until_date = created_at.date(), (until or created_at).date()
+        reviewed: dict[str, dict[str, Any]] = {}
 
+        # Github rejects collections spanning more than a year, so longer
+        # ranges are requested a year at a time.
+        window_since = since
+        while window_since <= until_date:
+            window_until = min(window_since + _CONTRIBUTIONS_WINDOW, until_date)
+            async for event in self._contributed(
+                window_since, window_until, exclusions, reviewed
+            ):
                 yield event
-                break
+            window_since = window_until + timedelta(days=1)
+
+        for event in _validate(list(reviewed.values()), EventSource.REVIEWS):
+            if exclusions.excludes(str(event.repository)):
+                continue
 
-    def tags_from(
+            for reviewed_event in self._reviewed_each_day(event, since, until_date):
+                yield reviewed_event
+
+    async def _contributed(
         self,
-        created_at: datetime,
-        excluded_repositories: list[str],
-        excluded_organizations: list[str],
-    ) -> Iterable[GithubEvent]:
-        response = self._make_request(
-            "post",
-            "https://api.github.com/graphql",
-            json={"query": queries.tags.format()},
+        since: date,
+        until: date,
+        exclusions: Exclusions,
+        reviewed: dict[str, dict[str, Any]],
+    ) -> AsyncIterable[GithubEvent]:
+        """
+        Stream the issues and pull requests contributed from `since` to `until`,
+        gathering reviewed pull requests into `reviewed`.
+        """
+
+        params = {
+            "username": self.username,
+            "since": datetime.combine(since, time.min, tzinfo=UTC).isoformat(),
+            "until": datetime.combine(
+                until + timedelta(days=1), time.min, tzinfo=UTC
+            ).isoformat(),
+        }
+
+        first_page = asyncio.ensure_future(
+            self._graphql_page(queries.contributions, cursor=None, **params)
         )
-        repositories: list = pydash.get(
-            response.json(), "data.viewer.repositories.nodes", []
+
+        try:
+            for connection, query in queries.contribution_connections.items():
+                async for edges in self._paginate_graphql(
+                    query,
+                    path=f"data.user.contributionsCollection.{connection}",
+                    # Every connection starts from the same response.
+                    first_page=asyncio.shield(first_page),
+                    more=None,
+                    **params,
+                ):
+                    contributed = []
+                    for edge in edges:
+                        node = edge["node"]
+
+                        # Gather the reviews of each pull request, like searches
+                        # return them.
+                        if review := node.get("pullRequestReview"):
+                            pull_request = node["pullRequest"]
+                            reviewed.setdefault(
+                                pull_request["id"],
+                                pull_request | {"reviews": {"nodes": []}},
+                            )["reviews"]["nodes"].append(review)
+                            continue
+
+                        contributed.append(node.get("issue") or node["pullRequest"])
+
+                    for event in _validate(contributed, EventSource.CONTRIBUTIONS):
+                        if not exclusions.excludes(str(event.repository)):
+                            yield event
+        finally:
+            first_page.cancel()
+
+    def _reviewed_each_day(
+        self, event: GithubEvent, since: date, until: date
+    ) -> Iterator[GithubEvent]:
+        # A pull request shows up once for every day it was reviewed on, with the
+        # time of that day's review.
+        reviewed_at = {
+            review.updated_at.date(): review.updated_at
+            for review in event.reviews
+            if review.username == self.username
+            and since <= review.updated_at.date() <= until
+        }
+        for updated_at in reviewed_at.values():
+            yield event.model_copy(update={"updated_at": updated_at})
+
+    @profiled_iterable("github.tags_from")
+    @metrics.sourced("tags")
+    async def tags_from(
+        self,
+        created_at: datetime,
+        exclusions: Exclusions,
+        until: datetime | None = None,
+    ) -> AsyncIterable[GithubEvent]:
+        # Tag dates carry the tagger's timezone, so look a day further back for
+        # pushes that may still hold tags of `created_at` in their local time.
+        pushed_since = datetime.combine(
+            created_at.date() - timedelta(days=1), time.min, tzinfo=UTC
         )
 
-        for repo in repositories:
-            repo_name = repo.get("nameWithOwner")
+        def pushed_recently(edges: list[dict[str, Any]]) -> bool:
+            return bool(edges) and _pushed_at(edges[-1]["node"]) >= pushed_since
 
-            if self._should_be_excluded(
-                repo_name, excluded_repositories, excluded_organizations
-            ):
-                continue
+        async for edges in self._paginate_graphql(
+            queries.tags,
+            path="data.viewer.repositories",
+            first_page=self._prefetched_page(EventSource.TAGS, created_at, until),
+            more=pushed_recently,
+        ):
+            for edge in edges:
+                repo = edge["node"]
+                # Repositories are ordered by their last push, so none of the
+                # remaining ones can hold a tag of `created_at`.
+                if _pushed_at(repo) < pushed_since:
+                    return
+
+                if exclusions.excludes(repo["nameWithOwner"]):
+                    continue
+
+                async for event in self._repository_tags(
+                    repo, created_at.date(), (until or created_at).date()
+                ):
+                    yield event
+
+    async def _repository_tags(
+        self, repo: dict[str, Any], since: date, until: date
+    ) -> AsyncIterable[GithubEvent]:
+        repo_name: str = repo["nameWithOwner"]
+        owner, name = repo_name.split("/")
+
+        def committed_since(edges: list[dict[str, Any]]) -> bool:
+            committed_at = bool(edges) and _tag_commit_date(edges[-1]["node"])
+            return not committed_at or committed_at.date() >= since - _TAG_LOOKBACK
 
-            for ref in pydash.get(repo, "refs.nodes", []):
+        # The tags selected along with the repository are its first page.
+        async for edges in self._paginate_graphql(
+            queries.repository_tags,
+            path="data.repository.refs",
+            first_page=_resolved({"data": {"repository": repo}}),
+            more=committed_since,
+            owner=owner,
+            name=name,
+        ):
+            tags = []
+            older = False
+            for edge in edges:
+                ref = edge["node"]
                 tag_name = ref.get("name")
-                target = ref.get("target", {})
-
-                # Get date from annotated tag or commit
-                if tagger := target.get("tagger"):
-                    tag_date = tagger.get("date")
-                elif author := target.get("author"):
-                    tag_date = author.get("date") or target.get("committedDate")
-                else:
+
+                if not (tag_date := _tag_date(ref)):
                     continue
 
-                # Filter by created_at date
-                tag_datetime = datetime.fromisoformat(tag_date)
-                if tag_datetime.date() != created_at.date():
+                # Tags are ordered by the date of their commit, newest first,
+                # and are made after it. Tags of older commits, such as
+                # backports, are looked for up to `_TAG_LOOKBACK` before `since`.
+                committed_at = _tag_commit_date(ref) or tag_date
+                if older := committed_at.date() < since - _TAG_LOOKBACK:
+                    break
+                if not since <= tag_date.date() <= until:
                     continue
 
-                yield GithubEvent.model_validate(
+                tags.append(
                     {
                         "id": f"tag-{repo_name}-{tag_name}",
                         "title": f"Tagged {tag_name}",
                         "url": f"https://github.com/{repo_name}/releases/tag/{tag_name}",
                         "created_at": tag_date,
                         "repository": {"nameWithOwner": repo_name},
-                        "event_type": "Tag",
                     }
                 )
 
-    def comments_from(
+            for event in _validate(tags, EventSource.TAGS):
+                yield event
+            if older:
+                return
+
+    @profiled_iterable("github.comments_from")
+    @metrics.sourced("comments")
+    async def comments_from(
         self,
         created_at: datetime,
-        excluded_repositories: list[str],
-        excluded_organizations: list[str],
-    ) -> Iterable[GithubEvent]:
-        response = self._make_request(
-            "post",
-            "https://api.github.com/graphql",
-            json={
-                "query": queries.comments.format(
-                    username=self.username,
-                    updated_at=f"{created_at:%Y-%m-%d}",
-                )
-            },
-        )
+        exclusions: Exclusions,
+        until: datetime | None = None,
+    ) -> AsyncIterable[GithubEvent]:
+        since, until_date = created_at.date(), (until or created_at).date()
 
-        for edge in pydash.get(response.json(), "data.search.edges", []):
-            node = edge.get("node", {})
+        def updated_since(edges: list[dict[str, Any]]) -> bool:
+            return bool(edges) and _updated_at(edges[-1]["node"]).date() >= since
 
-            for comment in pydash.get(node, "comments.nodes", []):
-                if pydash.get(comment, "author.login") != self.username:
-                    continue
+        async for edges in self._paginate_graphql(
+            queries.comments,
+            path="data.user.issueComments",
+            first_page=self._prefetched_page(EventSource.COMMENTS, created_at, until),
+            more=updated_since,
+            username=self.username,
+        ):
+            comments = []
+            older = False
+            for edge in edges:
+                comment = edge["node"]
 
-                comment_created_at = comment.get("createdAt")
-                comment_datetime = datetime.fromisoformat(comment_created_at)
+                # Comments are ordered by their last update, and a comment is
+                # never updated before it was created, so the rest are older.
+                if older := _updated_at(comment).date() < since:
+                    break
 
-                if comment_datetime.date() != created_at.date():
+                comment_created_at = comment["createdAt"]
+                if not (
+                    since
+                    <= datetime.fromisoformat(comment_created_at).date()
+                    <= until_date
+                ):
                     continue
 
-                repository_name = pydash.get(node, "repository.nameWithOwner")
-                if self._should_be_excluded(
-                    repository_name, excluded_repositories, excluded_organizations
-                ):
+                repository_name = comment["repository"]["nameWithOwner"]
+                if exclusions.excludes(repository_name):
                     continue
 
-                yield GithubEvent.model_validate(
+                # Comments on pull requests also point at their issue.
+                node = comment.get("pullRequest") or comment["issue"]
+                comments.append(
                     {
                         "id": f"comment-{node.get('id')}-"
                         f"{comment.get('url').split('#')[-1]}",
@@ -237,21 +555,249 @@ class Github:
                         "created_at": comment_created_at,
                         "repository": {"nameWithOwner": repository_name},
                         "state": node.get("state"),
-                        "event_type": "Comment",
                     }
                 )
 
-    def _make_graphql_request(self, query: str, path: str) -> list[GithubEvent]:
-        response = self._make_request(
-            "post", "https://api.github.com/graphql", json={"query": query}
+            for event in _validate(comments, EventSource.COMMENTS):
+                yield event
+            if older:
+                return
+
+    async def _verified_commits(self, commit_urls: dict[str, str]) -> dict[str, bool]:
+        """
+        Map each commit node ID in `commit_urls` to whether its signature is valid.
+
+        Signatures are resolved in batches through GraphQL `nodes(ids:)`. Commits
+        GraphQL could not resolve fall back to one REST request per commit URL.
+        """
+
+        node_ids = list(commit_urls)
+        verified: dict[str, bool] = {}
+
+        for signatures in await asyncio.gather(
+            *(
+                self._commit_signatures(node_ids[i : i + queries.NODES_LIMIT])
+                for i in range(0, len(node_ids), queries.NODES_LIMIT)
+            )
+        ):
+            verified.update(signatures)
+
+        missing = [node_id for node_id in node_ids if node_id not in verified]
+        for node_id, response in zip(
+            missing,
+            await asyncio.gather(
+                *(
+                    self._amake_request("get", commit_urls[node_id])
+                    for node_id in missing
+                )
+            ),
+            strict=True,
+        ):
+            verified[node_id] = pydash.get(
+                response.json(), "commit.verification.verified", False
+            )
+
+        return verified
+
+    async def _commit_signatures(self, node_ids: list[str]) -> dict[str, bool]:
+        response = await self._graphql(
+            queries.commit_signatures.format(), variables={"ids": node_ids}
+        )
+
+        # `nodes` keeps the order of the requested IDs, with null for the ones it
+        # could not resolve.
+        return {
+            node_id: bool(pydash.get(node, "signature.isValid", False))
+            for node_id, node in zip(
+                node_ids, pydash.get(response, "data.nodes") or [], strict=False
+            )
+            if node
+        }
+
+    async def _search(
+        self,
+        query: str,
+        exclusions: Exclusions,
+        since: datetime,
+        until: datetime | None,
+        source: EventSource,
+        first_page: Awaitable[dict[str, Any]] | None = None,
+        **params: str,
+    ) -> AsyncIterable[GithubEvent]:
+        """
+        Stream the events of a search over the days from `since` to `until`,
+        leaving excluded entries out of it.
+
+        Github validates the repositories and organizations of qualifiers, so a
+        renamed, deleted or hidden one fails the whole search. The search is
+        then made again without them, leaving exclusions to `excludes`.
+
+        Github only returns the first `SEARCH_RESULTS_LIMIT` results of a
+        search, so a search over several days matching more is split in halves
+        of days, searched on their own.
+        """
+
+        days = _date_range(since, until)
+        dated = params | {"created_at": days, "updated_at": days}
+        qualifiers = self._exclusion_qualifiers(exclusions)
+
+        page = await (
+            first_page
+            or self._graphql_page(query, cursor=None, exclusions=qualifiers, **dated)
         )
+        if page.get("errors") and qualifiers:
+            try:
+                _raise_for_errors(page, "data.search")
+            except DailySummaryQueryError:
+                qualifiers = ""
+                page = await self._graphql_page(
+                    query, cursor=None, exclusions=qualifiers, **dated
+                )
 
-        results = list[GithubEvent]()
-        for edge in pydash.get(response.json(), path, []):
-            if node := pydash.get(edge, "node", None):
-                results.append(GithubEvent.model_validate(node))
+        if halves := _split_search(
+            pydash.get(page, "data.search.issueCount", 0), since, until
+        ):
+            for half_since, half_until in halves:
+                async for event in self._search(
+                    query,
+                    exclusions,
+                    half_since,
+                    half_until,
+                    source,
+                    first_page=None,
+                    **params,
+                ):
+                    yield event
+            return
 
-        return results
+        async for event in self._make_graphql_request(
+            query,
+            path="data.search",
+            first_page=_resolved(page),
+            source=source,
+            exclusions=qualifiers,
+            **dated,
+        ):
+            yield event
+
+    async def _make_graphql_request(
+        self,
+        query: str,
+        path: str,
+        source: EventSource,
+        first_page: Awaitable[dict[str, Any]] | None = None,
+        **params: str,
+    ) -> AsyncIterable[GithubEvent]:
+        async for edges in self._paginate_graphql(
+            query, path, first_page=first_page, more=None, **params
+        ):
+            nodes = [node for edge in edges if (node := pydash.get(edge, "node", None))]
+            for event in _validate(nodes, source):
+                yield event
+
+    async def _paginate_graphql(
+        self,
+        query: str,
+        path: str,
+        first_page: Awaitable[dict[str, Any]] | None = None,
+        more: Callable[[list[dict[str, Any]]], bool] | None = None,
+        **params: str,
+    ) -> AsyncIterable[list[dict[str, Any]]]:
+        """
+        Stream the edges of the GraphQL connection found at `path`, page by page.
+
+        `query` is formatted with `params` and an `after` cursor. The next page is
+        requested as soon as the current one arrives, so it downloads while the
+        caller is still processing the current page. When given, `first_page`
+        is used instead of requesting the first page, and `more` decides from the
+        edges of the current page whether the next one is worth requesting.
+        """
+
+        next_page: asyncio.Future[dict[str, Any]] | None = asyncio.ensure_future(
+            first_page or self._graphql_page(query, cursor=None, **params)
+        )
+
+        try:
+            while next_page:
+                page = await next_page
+                _raise_for_errors(page, path)
+                connection = pydash.get(page, path) or {}
+
+                edges = connection.get("edges", [])
+
+                next_page = None
+                if pydash.get(connection, "pageInfo.hasNextPage", False) and (
+                    not more or more(edges)
+                ):
+                    next_page = asyncio.ensure_future(
+                        self._graphql_page(
+                            query,
+                            cursor=pydash.get(connection, "pageInfo.endCursor"),
+                            **params,
+                        )
+                    )
+
+                yield edges
+        finally:
+            # The caller may stop consuming early, so don't leave a dangling fetch.
+            if next_page:
+                next_page.cancel()
+
+    def _prefetched_page(
+        self, source: EventSource, created_at: datetime, until: datetime | None
+    ) -> Awaitable[dict[str, Any]] | None:
+        key = (source, created_at.date(), (until or created_at).date())
+        if not (response := self._prefetched.pop(key, None)):
+            return None
+
+        return self._unalias(response, source)
+
+    async def _unalias(
+        self, response: asyncio.Future[dict[str, Any]], source: EventSource
+    ) -> dict[str, Any]:
+        # Shape the aliased selection like the response of its own document.
+        field, _ = queries.combinable[source]
+        # Other sources await the same response, so never cancel it from here.
+        payload = await asyncio.shield(response)
+        return {
+            "data": {field: pydash.get(payload, f"data.{source}")},
+            # Errors are located by alias, or not at all when the whole query
+            # failed.
+            "errors": [
+                error
+                for error in payload.get("errors") or []
+                if not error.get("path") or error["path"][0] == source
+            ],
+        }
+
+    async def _graphql_page(
+        self, query: str, cursor: str | None, **params: str
+    ) -> dict[str, Any]:
+        return await self._graphql(
+            query.format(after=json.dumps(cursor), **self._profile_fields, **params)
+        )
+
+    async def _graphql(
+        self, query: str, variables: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        payload: dict[str, Any] = {"query": query}
+        if variables:
+            payload["variables"] = variables
+
+        response = (
+            await self._amake_request("post", f"{self.api_url}/graphql", json=payload)
+        ).json()
+
+        rate_limit = pydash.get(response, "data.rateLimit")
+        self._rate_limits.update_graphql(rate_limit)
+        if rate_limit and (recorder := metrics.current()):
+            recorder.inc(
+                "graphql_cost_total", rate_limit["cost"], source=metrics.source()
+            )
+            recorder.set(
+                "rate_limit_remaining", rate_limit["remaining"], resource="graphql"
+            )
+        return response
 
     @overload
     def _make_request(
@@ -268,6 +814,9 @@ class Github:
             (httpx.ReadTimeout, httpx.HTTPStatusError)
         ),
         wait=tenacity.wait_exponential(multiplier=1, min=4, max=5),
+        stop=_rejected,
+        reraise=True,
+        before_sleep=_count_retry,
     )
     def _make_request(
         self,
@@ -279,14 +828,26 @@ class Github:
         if method == "post":
             kwargs["json"] = json
 
-        response: httpx.Response = getattr(self._client, method)(
-            url=url, timeout=60, **kwargs
-        )
+        cached = self._cached_response(method, url)
+        if cached:
+            kwargs["headers"] = cached.conditional_headers()
 
-        if response.status_code == HTTPStatus.UNAUTHORIZED:
-            raise DailySummaryUnauthorizedError
+        self._rate_limits.throttle(self._rate_limits.resource_for(url))
 
-        return response.raise_for_status()
+        started_at = perf_counter()
+        try:
+            with self._scheduler.slot():
+                response: httpx.Response = getattr(self._client, method)(
+                    url=url, timeout=60, **kwargs
+                )
+        except httpx.TransportError:
+            self._record_request(url, started_at, None)
+            raise
+
+        self._rate_limits.update(response)
+        self._record_request(url, started_at, response)
+
+        return self._handle_response(method, url, response, cached)
 
     @overload
     async def _amake_request(
@@ -303,6 +864,9 @@ class Github:
             (httpx.ReadTimeout, httpx.HTTPStatusError)
         ),
         wait=tenacity.wait_exponential(multiplier=1, min=4, max=5),
+        stop=_rejected,
+        reraise=True,
+        before_sleep=_count_retry,
     )
     async def _amake_request(
         self,
@@ -314,21 +878,176 @@ class Github:
         if method == "post":
             kwargs["json"] = json
 
-        response: httpx.Response = await getattr(self._aclient, method)(
-            url=url, timeout=60, **kwargs
+        cached = self._cached_response(method, url)
+        if cached:
+            kwargs["headers"] = cached.conditional_headers()
+
+        await self._rate_limits.athrottle(self._rate_limits.resource_for(url))
+
+        started_at = perf_counter()
+        try:
+            async with self._scheduler.aslot():
+                response: httpx.Response = await getattr(self._aclient, method)(
+                    url=url, timeout=60, **kwargs
+                )
+        except httpx.TransportError:
+            self._record_request(url, started_at, None)
+            raise
+
+        self._rate_limits.update(response)
+        self._record_request(url, started_at, response)
+
+        return self._handle_response(method, url, response, cached)
+
+    def _record_request(
+        self, url: str, started_at: float, response: httpx.Response | None
+    ) -> None:
+        if not (recorder := metrics.current()):
+            return
+
+        labels = {
+            "service": "github",
+            "source": metrics.source(),
+            "endpoint": _endpoint(self.api_url, url),
+        }
+        status = str(response.status_code) if response else "error"
+        recorder.inc("requests_total", status=status, **labels)
+        recorder.observe(
+            "request_duration_seconds", perf_counter() - started_at, **labels
         )
+        if response is None:
+            return
+
+        recorder.inc("response_bytes_total", len(response.content), **labels)
+        resource = self._rate_limits.resource_for(url)
+        if budget := self._rate_limits.budgets.get(resource):
+            recorder.set("rate_limit_remaining", budget.remaining, resource=resource)
+
+    def _cached_response(
+        self, method: Literal["post", "get"], url: str
+    ) -> CachedResponse | None:
+        if method != "get" or not self._cache:
+            return None
+        return self._cache.get(f"{self.fingerprint}:{url}")
+
+    def _handle_response(
+        self,
+        method: Literal["post", "get"],
+        url: str,
+        response: httpx.Response,
+        cached: CachedResponse | None,
+    ) -> httpx.Response:
+        # Github doesn't charge any rate limit for revalidated responses.
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            if cached:
+                return cached.to_response(response.request)
+            # Such as a replayed revalidation, which asking again won't change.
+            raise DailySummaryError(f"Unexpected 304 Not Modified for {url}")
 
         if response.status_code == HTTPStatus.UNAUTHORIZED:
             raise DailySummaryUnauthorizedError
 
-        return response.raise_for_status()
+        response.raise_for_status()
 
-    def _should_be_excluded(
-        self, name: str, exclusions: list[str], excluded_organizations: list[str]
-    ) -> bool:
-        return any(
-            (
-                any(organization in name for organization in excluded_organizations),
-                any(name in exclusion for exclusion in exclusions),
-            ),
+        if method == "get" and self._cache:
+            self._cache.put(f"{self.fingerprint}:{url}", response)
+
+        return response
+
+    def _exclusion_qualifiers(
+        self, exclusions: Exclusions, separator: str = " "
+    ) -> str:
+        max_length = (
+            queries.SEARCH_QUERY_LIMIT
+            - queries.SEARCH_TERMS_LENGTH
+            - len(self.username)
         )
+        return "".join(
+            separator + qualifier for qualifier in exclusions.qualifiers(max_length)
+        )
+
+
+def _raise_for_errors(response: dict[str, Any], path: str) -> None:
+    # Github answers failed queries with errors, and nothing at their path.
+    if not (errors := response.get("errors")) or pydash.get(response, path):
+        return
+
+    raise DailySummaryQueryError(
+        "; ".join(error.get("message", str(error)) for error in errors)
+    )
+
+
+def _validate(items: list[dict[str, Any]], source: EventSource) -> list[GithubEvent]:
+    with span("validation"):
+        return validate_events(items, source)
+
+
+def _split_search(
+    count: int, since: datetime, until: datetime | None
+) -> list[tuple[datetime, datetime]]:
+    """
+    Halves of the days from `since` to `until` to search on their own, when a
+    search over them matched `count` results, more than Github returns.
+    """
+
+    if count <= queries.SEARCH_RESULTS_LIMIT:
+        return []
+
+    if until and until.date() > since.date():
+        middle = since + timedelta(days=(until.date() - since.date()).days // 2)
+        return [(since, middle), (middle + timedelta(days=1), until)]
+
+    warnings.warn(
+        f"Github only returns {queries.SEARCH_RESULTS_LIMIT} of the {count} events "
+        f"searched on {since:%Y-%m-%d}, the others are left out",
+        stacklevel=2,
+    )
+    return []
+
+
+def _date_range(since: datetime, until: datetime | None) -> str:
+    """Search qualifier value for the days from `since` to `until`."""
+
+    if not until or until.date() == since.date():
+        return f"{since:%Y-%m-%d}"
+    return f"{since:%Y-%m-%d}..{until:%Y-%m-%d}"
+
+
+def _pushed_at(repo: dict[str, Any]) -> datetime:
+    if pushed_at := repo.get("pushedAt"):
+        return datetime.fromisoformat(pushed_at)
+    return datetime.min.replace(tzinfo=UTC)
+
+
+def _updated_at(node: dict[str, Any]) -> datetime:
+    return datetime.fromisoformat(node["updatedAt"])
+
+
+def _tag_commit_date(ref: dict[str, Any]) -> datetime | None:
+    target = ref.get("target") or {}
+
+    # Annotated tags point to their commit, lightweight ones are the commit.
+    committed_at = (target.get("target") or {}).get("committedDate") or target.get(
+        "committedDate"
+    )
+    if not committed_at:
+        return _tag_date(ref)
+    return datetime.fromisoformat(committed_at)
+
+
+def _tag_date(ref: dict[str, Any]) -> datetime | None:
+    target = ref.get("target") or {}
+
+    # Get date from annotated tag or commit
+    if tagger := target.get("tagger"):
+        tag_date = tagger.get("date")
+    elif author := target.get("author"):
+        tag_date = author.get("date") or target.get("committedDate")
+    else:
+        tag_date = None
+
+    return datetime.fromisoformat(tag_date) if tag_date else None
+
+
+async def _resolved(payload: dict[str, Any]) -> dict[str, Any]:
+    return payload
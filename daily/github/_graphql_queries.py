@@ -4,17 +4,80 @@
 # Created at <2025-03-15 Sat 00:17>
 
 
+from enum import StrEnum
 from typing import Final
 
-issues: Final[str] = """
-{{
-  search(query: "author:{username} created:{created_at}", type: ISSUE, first: 100) {{
+# Maximum number of IDs accepted by a single `nodes(ids:)` lookup.
+NODES_LIMIT: Final[int] = 100
+
+# Github doesn't support search queries longer than this.
+SEARCH_QUERY_LIMIT: Final[int] = 256
+
+# Github only ever returns this many results of a search, however many match.
+SEARCH_RESULTS_LIMIT: Final[int] = 1000
+
+# Length of the longest search query, for a date range, without the username
+# and exclusions. The rest of `SEARCH_QUERY_LIMIT` is left to exclusions.
+SEARCH_TERMS_LENGTH: Final[int] = 72
+
+
+class QueryProfile(StrEnum):
+    """Fields selected by the queries. `minimal` only selects rendered fields."""
+
+    MINIMAL = "minimal"
+    FULL = "full"
+
+
+# Values of the placeholders of optional fields, per profile. Bodies and tag
+# authors are never rendered in summaries, so only the full profile selects them.
+profile_fields: Final[dict[QueryProfile, dict[str, str]]] = {
+    QueryProfile.MINIMAL: {"body": "", "identity": ""},
+    QueryProfile.FULL: {"body": "body", "identity": "name email"},
+}
+
+# Selected by every document so the rate limit governor knows the budget left.
+rate_limit: Final[str] = """
+  rateLimit {{
+    limit
+    cost
+    remaining
+    resetAt
+  }}"""
+
+
+def document(*selections: str, variables: str = "") -> str:
+    """
+    Build a query document out of top-level `selections`, plus `rateLimit`.
+
+    The result is still a template, to be filled in with `str.format`.
+    """
+
+    operation = f"query({variables}) " if variables else ""
+    return operation + "{{" + rate_limit + "".join(selections) + "\n}}\n"
+
+
+def aliased(alias: str, selection: str) -> str:
+    return f"\n  {alias}: {selection.lstrip()}"
+
+
+issues_selection: Final[str] = """
+  search(
+    query: "author:{username} created:{created_at}{exclusions}"
+    type: ISSUE
+    first: 100
+    after: {after}
+  ) {{
+    issueCount
+    pageInfo {{
+      hasNextPage
+      endCursor
+    }}
     edges {{
       node {{
         ... on Issue {{
           id
           title
-          body
+          {body}
           url
           repository {{
             nameWithOwner
@@ -26,7 +89,7 @@ issues: Final[str] = """
         ... on PullRequest {{
           id
           title
-          body
+          {body}
           url
           repository {{
             nameWithOwner
@@ -38,17 +101,21 @@ issues: Final[str] = """
         }}
       }}
     }}
-  }}
-}}
-"""
+  }}"""
+issues: Final[str] = document(issues_selection)
 
-reviews: Final[str] = """
-{{
+reviews_selection: Final[str] = """
   search(
-    first: 100
-    query: "updated:{updated_at} type:pr reviewed-by:{username}"
+    query: "updated:{updated_at} type:pr reviewed-by:{username}{exclusions}"
     type: ISSUE
+    first: 100
+    after: {after}
   ) {{
+    issueCount
+    pageInfo {{
+      hasNextPage
+      endCursor
+    }}
     edges {{
       node {{
         ... on PullRequest {{
@@ -74,95 +141,271 @@ reviews: Final[str] = """
         }}
       }}
     }}
-  }}
-}}
-"""
+  }}"""
+reviews: Final[str] = document(reviews_selection)
 
-tags: Final[str] = """
-{{
+# Repositories are ordered by their last push and tags by the date of the
+# commit they point to, newest first, so the scan can stop once both are older
+# than the requested days.
+tags_selection: Final[str] = """
   viewer {{
     login
-    repositories(first: 100, ownerAffiliations: [OWNER]) {{
-      nodes {{
-        nameWithOwner
-        refs(refPrefix: "refs/tags/", first: 100, orderBy: {{field: TAG_COMMIT_DATE,
-             direction: ASC}}) {{
-          nodes {{
-            name
-            target {{
-              ... on Tag {{
-                tagger {{
-                  name
-                  email
-                  date
+    repositories(
+      first: 100
+      after: {after}
+      ownerAffiliations: [OWNER]
+      orderBy: {{field: PUSHED_AT, direction: DESC}}
+    ) {{
+      pageInfo {{
+        hasNextPage
+        endCursor
+      }}
+      edges {{
+        node {{
+          nameWithOwner
+          pushedAt
+          refs(
+            refPrefix: "refs/tags/"
+            first: 20
+            orderBy: {{field: TAG_COMMIT_DATE, direction: DESC}}
+          ) {{
+            pageInfo {{
+              hasNextPage
+              endCursor
+            }}
+            edges {{
+              node {{
+                name
+                target {{
+                  ... on Tag {{
+                    tagger {{
+                      {identity}
+                      date
+                    }}
+                    target {{
+                      ... on Commit {{
+                        committedDate
+                      }}
+                    }}
+                  }}
+                  ... on Commit {{
+                    committedDate
+                    author {{
+                      {identity}
+                      date
+                    }}
+                  }}
                 }}
               }}
-              ... on Commit {{
-                committedDate
-                author {{
-                  name
-                  email
-                  date
+            }}
+          }}
+        }}
+      }}
+    }}
+  }}"""
+tags: Final[str] = document(tags_selection)
+
+repository_tags_selection: Final[str] = """
+  repository(owner: "{owner}", name: "{name}") {{
+    refs(
+      refPrefix: "refs/tags/"
+      first: 20
+      after: {after}
+      orderBy: {{field: TAG_COMMIT_DATE, direction: DESC}}
+    ) {{
+      pageInfo {{
+        hasNextPage
+        endCursor
+      }}
+      edges {{
+        node {{
+          name
+          target {{
+            ... on Tag {{
+              tagger {{
+                {identity}
+                date
+              }}
+              target {{
+                ... on Commit {{
+                  committedDate
                 }}
               }}
             }}
+            ... on Commit {{
+              committedDate
+              author {{
+                {identity}
+                date
+              }}
+            }}
           }}
         }}
       }}
     }}
-  }}
-}}
-"""
+  }}"""
+repository_tags: Final[str] = document(repository_tags_selection)
 
-comments: Final[str] = """
-{{
-  search(query: "commenter:{username} updated:{updated_at}", type: ISSUE, first: 100) {{
-    edges {{
-      node {{
-        ... on Issue {{
-          id
-          title
+# The user's own comments, most recently updated first, so the scan can stop as
+# soon as it crosses the start of the requested days.
+comments_selection: Final[str] = """
+  user(login: "{username}") {{
+    issueComments(
+      first: 100
+      after: {after}
+      orderBy: {{field: UPDATED_AT, direction: DESC}}
+    ) {{
+      pageInfo {{
+        hasNextPage
+        endCursor
+      }}
+      edges {{
+        node {{
           url
-          state
+          {body}
           createdAt
+          updatedAt
           repository {{
             nameWithOwner
           }}
-          comments(last: 100) {{
-            nodes {{
-              author {{
-                login
+          issue {{
+            id
+            title
+            state
+          }}
+          pullRequest {{
+            id
+            title
+            state
+          }}
+        }}
+      }}
+    }}
+  }}"""
+comments: Final[str] = document(comments_selection)
+
+# Connections of a contributions collection, each paged on its own.
+_contribution_connections: Final[dict[str, str]] = {
+    "issueContributions": """
+      issueContributions(first: 100, after: {after}) {{
+        pageInfo {{
+          hasNextPage
+          endCursor
+        }}
+        edges {{
+          node {{
+            issue {{
+              id
+              title
+              {body}
+              url
+              repository {{
+                nameWithOwner
               }}
-              body
               createdAt
               updatedAt
-              url
+              state
             }}
           }}
         }}
-        ... on PullRequest {{
-          id
-          title
-          url
-          state
-          createdAt
-          repository {{
-            nameWithOwner
+      }}""",
+    "pullRequestContributions": """
+      pullRequestContributions(first: 100, after: {after}) {{
+        pageInfo {{
+          hasNextPage
+          endCursor
+        }}
+        edges {{
+          node {{
+            pullRequest {{
+              id
+              title
+              {body}
+              url
+              repository {{
+                nameWithOwner
+              }}
+              createdAt
+              updatedAt
+              state
+              mergedAt
+            }}
           }}
-          comments(last: 100) {{
-            nodes {{
+        }}
+      }}""",
+    "pullRequestReviewContributions": """
+      pullRequestReviewContributions(first: 100, after: {after}) {{
+        pageInfo {{
+          hasNextPage
+          endCursor
+        }}
+        edges {{
+          node {{
+            pullRequest {{
+              title
+              id
+              url
+              state
+              createdAt
+              repository {{
+                nameWithOwner
+              }}
+            }}
+            pullRequestReview {{
               author {{
                 login
               }}
-              body
+              state
               createdAt
               updatedAt
               url
             }}
           }}
         }}
+      }}""",
+}
+
+
+def _contributions_selection(*connections: str) -> str:
+    return (
+        """
+  user(login: "{username}") {{
+    contributionsCollection(from: "{since}", to: "{until}") {{"""
+        + "".join(connections)
+        + """
+    }}
+  }}"""
+    )
+
+
+# The first page of every connection of the collection, in a single document.
+contributions: Final[str] = document(
+    _contributions_selection(*_contribution_connections.values())
+)
+
+# The following pages of each connection of the collection, by connection.
+contribution_connections: Final[dict[str, str]] = {
+    name: document(_contributions_selection(connection))
+    for name, connection in _contribution_connections.items()
+}
+
+# Selections that can share a single document, by source, along with the
+# top-level field each of them selects.
+combinable: Final[dict[str, tuple[str, str]]] = {
+    "issues": ("search", issues_selection),
+    "reviews": ("search", reviews_selection),
+    "comments": ("user", comments_selection),
+    "tags": ("viewer", tags_selection),
+}
+
+commit_signatures_selection: Final[str] = """
+  nodes(ids: $ids) {{
+    ... on Commit {{
+      signature {{
+        isValid
       }}
     }}
-  }}
-}}
-"""
+  }}"""
+commit_signatures: Final[str] = document(
+    commit_signatures_selection, variables="$ids: [ID!]!"
+)
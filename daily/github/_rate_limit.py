@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 11:40>
+
+import asyncio
+import time
+from datetime import UTC, datetime
+from http import HTTPStatus
+from typing import Any, NamedTuple
+
+import httpx
+
+# Seconds to back off after a secondary rate limit without a Retry-After header,
+# as recommended by Github.
+_SECONDARY_RATE_LIMIT_BACKOFF = 60.0
+
+
+class RateLimit(NamedTuple):
+    limit: int
+    remaining: int
+    reset_at: datetime
+
+    def __str__(self) -> str:
+        return f"{self.remaining}/{self.limit} (resets at {self.reset_at:%H:%M:%S %Z})"
+
+
+class RateLimitGovernor:
+    """
+    Pace requests against Github's rate limit budgets.
+
+    Budgets are tracked per resource (`core`, `search`, `graphql`) from the
+    `X-RateLimit-*` headers and the GraphQL `rateLimit` field. Once a budget gets
+    below `pace_below` of its limit, requests are spread evenly until it resets,
+    and once only `reserve` requests are left they wait for the reset. A
+    `Retry-After` header blocks every resource for the requested time.
+    """
+
+    def __init__(self, reserve: int = 1, pace_below: float = 0.1) -> None:
+        self._reserve = reserve
+        self._pace_below = pace_below
+
+        self._budgets: dict[str, RateLimit] = {}
+        self._next_slot: dict[str, float] = {}
+        self._blocked_until = 0.0
+
+    @property
+    def budgets(self) -> dict[str, RateLimit]:
+        return dict(self._budgets)
+
+    @staticmethod
+    def resource_for(url: httpx.URL | str) -> str:
+        # Github Enterprise serves the API under a prefix, such as `/api/v3`.
+        path = httpx.URL(url).path
+        if "/search/" in path:
+            return "search"
+        if path.endswith("/graphql"):
+            return "graphql"
+        return "core"
+
+    def throttle(self, resource: str) -> None:
+        if delay := self._delay(resource):
+            time.sleep(delay)
+
+    async def athrottle(self, resource: str) -> None:
+        if delay := self._delay(resource):
+            await asyncio.sleep(delay)
+
+    def update(self, response: httpx.Response) -> None:
+        headers = response.headers
+        now = time.time()
+
+        if response.status_code in (HTTPStatus.FORBIDDEN, HTTPStatus.TOO_MANY_REQUESTS):
+            if retry_after := headers.get("retry-after"):
+                self._block_until(now + float(retry_after))
+            elif headers.get("x-ratelimit-remaining") == "0":
+                self._block_until(float(headers["x-ratelimit-reset"]))
+            elif (
+                response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+                or "rate limit" in response.text.lower()
+            ):
+                self._block_until(now + _SECONDARY_RATE_LIMIT_BACKOFF)
+
+        if "x-ratelimit-remaining" not in headers:
+            return
+
+        self._record(
+            headers.get("x-ratelimit-resource")
+            or self.resource_for(response.request.url),
+            limit=int(headers.get("x-ratelimit-limit", 0)),
+            remaining=int(headers["x-ratelimit-remaining"]),
+            reset_at=datetime.fromtimestamp(
+                int(headers.get("x-ratelimit-reset", now)), tz=UTC
+            ),
+        )
+
+    def update_graphql(self, rate_limit: dict[str, Any] | None) -> None:
+        if not rate_limit:
+            return
+
+        self._record(
+            "graphql",
+            limit=rate_limit.get("limit", 0),
+            remaining=rate_limit["remaining"],
+            reset_at=datetime.fromisoformat(rate_limit["resetAt"]),
+        )
+
+    def _record(
+        self, resource: str, limit: int, remaining: int, reset_at: datetime
+    ) -> None:
+        # Responses can arrive out of order, so within the same window only ever
+        # lower the remaining budget.
+        current = self._budgets.get(resource)
+        if current and current.reset_at == reset_at:
+            remaining = min(remaining, current.remaining)
+
+        self._budgets[resource] = RateLimit(
+            limit=limit or (current.limit if current else 0),
+            remaining=remaining,
+            reset_at=reset_at,
+        )
+
+    def _block_until(self, timestamp: float) -> None:
+        self._blocked_until = max(self._blocked_until, timestamp)
+
+    def _delay(self, resource: str) -> float:
+        now = time.time()
+        delay = self._blocked_until - now
+
+        budget = self._budgets.get(resource)
+        if not budget or (reset_at := budget.reset_at.timestamp()) <= now:
+            return max(delay, 0.0)
+
+        if budget.remaining <= self._reserve:
+            return max(delay, reset_at - now)
+
+        if budget.remaining <= budget.limit * self._pace_below:
+            # Spread what is left of the budget evenly until it resets.
+            slot = max(self._next_slot.get(resource, now), now)
+            self._next_slot[resource] = slot + (reset_at - now) / budget.remaining
+            delay = max(delay, slot - now)
+
+        # Account for this request until the response reports the real budget.
+        self._budgets[resource] = budget._replace(remaining=budget.remaining - 1)
+        return max(delay, 0.0)
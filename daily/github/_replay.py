@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 17:10>
+
+import base64
+import hashlib
+import json
+from pathlib import Path
+
+import httpx
+
+from daily.exceptions import DailySummaryError
+
+
+def _key(request: httpx.Request) -> str:
+    # Headers are left out, so tokens never end up in recordings and conditional
+    # requests replay the same exchange.
+    exchange = b"\0".join(
+        (request.method.encode(), str(request.url).encode(), request.content)
+    )
+    return hashlib.sha256(exchange).hexdigest()
+
+
+class RecordingTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    Send requests through `transport` and `atransport`, recording every exchange.
+
+    Each exchange is written to `directory` as a JSON file named after the
+    method, URL and body of its request, to be served by `ReplayTransport`.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        transport: httpx.BaseTransport,
+        atransport: httpx.AsyncBaseTransport,
+    ) -> None:
+        self.directory = directory
+        self._transport = transport
+        self._atransport = atransport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._transport.handle_request(request)
+        response.read()
+        return self._record(request, response)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._atransport.handle_async_request(request)
+        await response.aread()
+        return self._record(request, response)
+
+    def _record(
+        self, request: httpx.Request, response: httpx.Response
+    ) -> httpx.Response:
+        # Content is stored decoded, so drop its original encoding.
+        headers = [
+            (name, value)
+            for name, value in response.headers.items()
+            if name not in ("content-encoding", "content-length")
+        ]
+        exchange = {
+            "request": {
+                "method": request.method,
+                "url": str(request.url),
+                "content": base64.b64encode(request.content).decode(),
+            },
+            "response": {
+                "status_code": response.status_code,
+                "headers": headers,
+                "content": base64.b64encode(response.content).decode(),
+            },
+        }
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{_key(request)}.json").write_text(json.dumps(exchange))
+
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=response.content,
+            request=request,
+        )
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Serve the exchanges recorded by `RecordingTransport`, without any network."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        path = self.directory / f"{_key(request)}.json"
+        try:
+            exchange = json.loads(path.read_text())["response"]
+        except FileNotFoundError:
+            raise DailySummaryError(
+                f"No recorded response for {request.method} {request.url}"
+            ) from None
+
+        return httpx.Response(
+            exchange["status_code"],
+            headers=exchange["headers"],
+            content=base64.b64decode(exchange["content"]),
+            request=request,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return self.handle_request(request)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 11:02>
+
+import asyncio
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx
+
+
+class RequestScheduler:
+    """
+    Bound the number of in-flight requests made to Github.
+
+    The sync and async clients share the same `max_in_flight` slots, so
+    requests made from threads, such as `get_user`, count against the same
+    cap. The scheduler also owns the connection pools, so a single scheduler
+    can be handed to several `Github` instances to share connections and cap
+    their combined traffic.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        max_connections: int = 8,
+        max_keepalive_connections: int = 8,
+        keepalive_expiry: float = 30.0,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+
+        self.transport: httpx.BaseTransport = httpx.HTTPTransport(limits=self.limits)
+        self.atransport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+            limits=self.limits
+        )
+
+        self._lock = threading.Lock()
+        self._free = max_in_flight
+        # Callbacks handing a freed slot to a waiting thread or task, in order.
+        self._waiters: deque[Callable[[], None]] = deque()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self._lock:
+            granted = threading.Event()
+            if self._free:
+                self._free -= 1
+                granted.set()
+            else:
+                self._waiters.append(granted.set)
+
+        granted.wait()
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        # Waiting tasks are woken by their loop, so they don't hold the threads
+        # of its executor, which requests need to resolve hosts.
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def grant() -> None:
+            loop.call_soon_threadsafe(_resolve, granted)
+
+        with self._lock:
+            if self._free:
+                self._free -= 1
+                granted.set_result(None)
+            else:
+                self._waiters.append(grant)
+
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                if grant in self._waiters:
+                    self._waiters.remove(grant)
+                    raise
+            # The slot was handed over as the task got cancelled.
+            self._release()
+            raise
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft()()
+            else:
+                self._free += 1
+
+
+def _resolve(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
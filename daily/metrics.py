@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 19:10>
+
+import bisect
+import json
+import os
+import threading
+from collections import defaultdict
+from collections.abc import AsyncGenerator, AsyncIterable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import StrEnum
+from pathlib import Path
+from typing import ParamSpec, TextIO, TypeVar
+
+from ._wrapping import wrap_iterable
+
+NAMESPACE = "daily_summary"
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Name, type and help of every metric.
+METRICS = {
+    "requests_total": ("counter", "Requests made, by response status."),
+    "retries_total": ("counter", "Requests retried after failing."),
+    "response_bytes_total": ("counter", "Bytes of response bodies received."),
+    "request_duration_seconds": ("histogram", "Time taken by requests."),
+    "graphql_cost_total": ("counter", "Rate limit points spent on GraphQL queries."),
+    "rate_limit_remaining": ("gauge", "Rate limit budget left, by resource."),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricsFormat(StrEnum):
+    PROMETHEUS = "prometheus"
+    JSON = "json"
+
+
+class _Histogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[tuple[str, int]]:
+        total = 0
+        for bound, count in zip((*map(str, BUCKETS), "+Inf"), self.counts, strict=True):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    """
+    Usage of Github and Ollama during a run.
+
+    Requests are labeled by `service`, the `source` of events they were made
+    for and their `endpoint`. Metrics are recorded from several threads, so
+    every update is made under a lock.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: dict[str, dict[Labels, float]] = defaultdict(dict)
+        self._histograms: dict[str, dict[Labels, _Histogram]] = defaultdict(dict)
+
+    def inc(self, name: str, value: float = 1, /, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            values = self._values[name]
+            values[key] = values.get(key, 0) + value
+
+    def set(self, name: str, value: float, /, **labels: str) -> None:
+        with self._lock:
+            self._values[name][_labels(labels)] = value
+
+    def observe(self, name: str, value: float, /, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            histograms = self._histograms[name]
+            histogram = histograms.get(key) or histograms.setdefault(key, _Histogram())
+            histogram.observe(value)
+
+    def value(self, name: str, /, **labels: str) -> float:
+        with self._lock:
+            return self._values[name].get(_labels(labels), 0)
+
+    def write_prometheus(self, file: TextIO) -> None:
+        """Write in the text format read by node-exporter's textfile collector."""
+
+        with self._lock:
+            for name, (kind, description) in METRICS.items():
+                metric = f"{NAMESPACE}_{name}"
+                samples = self._values.get(name) or self._histograms.get(name)
+                if not samples:
+                    continue
+
+                file.write(f"# HELP {metric} {description}\n")
+                file.write(f"# TYPE {metric} {kind}\n")
+
+                file.writelines(
+                    f"{metric}{_format(labels)} {value:g}\n"
+                    for labels, value in sorted(self._values.get(name, {}).items())
+                )
+
+                for labels, histogram in sorted(self._histograms.get(name, {}).items()):
+                    for bound, count in histogram.cumulative():
+                        bucket = _format((*labels, ("le", bound)))
+                        file.write(f"{metric}_bucket{bucket} {count}\n")
+                    file.write(f"{metric}_sum{_format(labels)} {histogram.sum:g}\n")
+                    file.write(f"{metric}_count{_format(labels)} {histogram.count}\n")
+
+    def write_json(self, file: TextIO) -> None:
+        with self._lock:
+            report = {
+                name: [
+                    {"labels": dict(labels), "value": value}
+                    for labels, value in sorted(values.items())
+                ]
+                for name, values in self._values.items()
+            } | {
+                name: [
+                    {
+                        "labels": dict(labels),
+                        "buckets": dict(histogram.cumulative()),
+                        "sum": histogram.sum,
+                        "count": histogram.count,
+                    }
+                    for labels, histogram in sorted(histograms.items())
+                ]
+                for name, histograms in self._histograms.items()
+            }
+        json.dump(report, file, indent=2)
+        file.write("\n")
+
+    def write(self, path: Path, metrics_format: MetricsFormat) -> None:
+        # Collectors may read the file at any time, so replace it atomically.
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, "w") as file:
+            if metrics_format == MetricsFormat.PROMETHEUS:
+                self.write_prometheus(file)
+            else:
+                self.write_json(file)
+        os.replace(tmp, path)
+
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_metrics: ContextVar[Metrics | None] = ContextVar("metrics", default=None)
+_source: ContextVar[str] = ContextVar("source", default="")
+
+
+def use(metrics: Metrics) -> None:
+    """Count requests on `metrics` from now on, including those of later tasks."""
+
+    _metrics.set(metrics)
+
+
+def current() -> Metrics | None:
+    return _metrics.get()
+
+
+def source() -> str:
+    """Source of events the current request is made for."""
+
+    return _source.get()
+
+
+@contextmanager
+def labeled(name: str) -> Iterator[None]:
+    token = _source.set(name)
+    try:
+        yield
+    finally:
+        _source.reset(token)
+
+
+def sourced(
+    name: str,
+) -> Callable[[Callable[P, AsyncIterable[T]]], Callable[P, AsyncIterable[T]]]:
+    """Label the requests made while iterating an async iterable with `name`."""
+
+    async def labeled_steps(iterable: AsyncIterable[T]) -> AsyncGenerator[T, None]:
+        iterator = aiter(iterable)
+        while True:
+            # Only label the source's own steps, not its consumer's.
+            with labeled(name):
+                try:
+                    item = await anext(iterator)
+                except StopAsyncIteration:
+                    return
+            yield item
+
+    return wrap_iterable(labeled_steps)
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _format(labels: Labels) -> str:
+    if not labels:
+        return ""
+
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
@@ -3,20 +3,27 @@
 # Author: Ben Mezger <me@benmezger.nl>
 # Created at <2025-02-28 Fri 23:18>
 
-import re
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
 from datetime import datetime
 from enum import StrEnum
-from typing import Annotated, Self, Union
+from functools import cached_property
+from typing import Annotated, Any, Union
 
-import pydash
 from pydantic import (
     AliasChoices,
     AliasPath,
     BaseModel,
     BeforeValidator,
+    ConfigDict,
     Field,
+    GetCoreSchemaHandler,
+    TypeAdapter,
+    ValidationInfo,
     model_validator,
 )
+from pydantic_core import CoreSchema, core_schema
 
 
 class Account(BaseModel):
@@ -36,35 +43,66 @@ class EventType(StrEnum):
     COMMENT = "Comment"
 
 
+class EventSource(StrEnum):
+    ISSUES = "issues"
+    COMMITS = "commits"
+    REVIEWS = "reviews"
+    TAGS = "tags"
+    COMMENTS = "comments"
+    CONTRIBUTIONS = "contributions"
+
+
 class Repository(BaseModel):
+    """
+    A Github repository, shared by all of its events.
+
+    Validated events get their repository from `Repository.named`, so each one
+    is parsed and formatted once per run. Instances are frozen, as they're
+    shared.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
     name: str
     owner: str
 
+    @classmethod
+    def named(cls, owner: str, name: str) -> "Repository":
+        key = (owner, name)
+        if (repository := _repositories.get(key)) is None:
+            repository = _repositories.setdefault(key, cls(owner=owner, name=name))
+        return repository
+
     @staticmethod
-    def split_name_with_owner(
-        value: Union[dict, "Repository"],
-    ) -> Union[dict, "Repository"]:
+    def split_name_with_owner(value: Union[dict, "Repository"]) -> "Repository":
         if isinstance(value, Repository):
             return value
+        if {"name", "owner"} <= value.keys():
+            return Repository.named(value["owner"], value["name"])
 
-        if not (name_with_owner := value.pop("nameWithOwner", None)):
-            name_with_owner = value.pop("full_name")
+        name_with_owner = value.get("nameWithOwner") or value["full_name"]
+        organization, _, repository_name = name_with_owner.partition("/")
 
-        organization, repository_name = re.search(
-            r"([^/]+)/([^/]+)", name_with_owner
-        ).groups()
+        return Repository.named(organization, repository_name)
 
-        return {"name": repository_name, "owner": organization}
+    @cached_property
+    def name_with_owner(self) -> str:
+        return f"{self.owner}/{self.name}"
 
-    @property
+    @cached_property
     def repository_url(self) -> str:
-        return f"https://github.com/{self}"
+        return f"https://github.com/{self.name_with_owner}"
 
     def __str__(self) -> str:
-        return f"{self.owner}/{self.name}"
+        return self.name_with_owner
+
+
+_repositories: dict[tuple[str, str], Repository] = {}
 
 
 class GithubReview(BaseModel):
+    model_config = ConfigDict(validate_by_name=True)
+
     username: str = Field(
         validation_alias=AliasChoices("login", AliasPath("author", "login"))
     )
@@ -74,6 +112,8 @@ class GithubReview(BaseModel):
 
 
 class GithubEvent(BaseModel):
+    model_config = ConfigDict(validate_by_name=True)
+
     id: str = Field(validation_alias=AliasChoices("id", "node_id"))
     title: str = Field(
         validation_alias=AliasChoices("title", AliasPath("commit", "message"))
@@ -105,8 +145,17 @@ class GithubEvent(BaseModel):
 
     @model_validator(mode="before")
     @classmethod
-    def set_event_type(cls: type["GithubEvent"], data: dict) -> dict:
-        if data.get("event_type"):
+    def set_event_type(
+        cls: type["GithubEvent"], data: Any, info: ValidationInfo
+    ) -> Any:
+        # Rows of an `EventTable` are left for their own schema, see `Event`.
+        if not isinstance(data, dict) or data.get("event_type"):
+            return data
+
+        # Sources returning a single type of event pass it along, see
+        # `validate_events`.
+        if info.context and (event_type := info.context.get("event_type")):
+            data["event_type"] = event_type
             return data
 
         event_type = EventType.ISSUE
@@ -125,29 +174,248 @@ class GithubEvent(BaseModel):
         return f"{self.title} @{self.repository} - {self.created_at}"
 
 
-class Summary(BaseModel):
-    title: str
-    description: str | None
-    repository_url: str
-    event_url: str
-    event_type: EventType
-    organization: str
-    state: str | None
+_EVENT_TYPES = tuple(EventType)
+_EVENT_TYPE_CODES = {event_type: code for code, event_type in enumerate(_EVENT_TYPES)}
+# `merged` is either unknown, false or true.
+_MERGED_CODES = {None: -1, False: 0, True: 1}
+
+
+class EventTable:
+    """
+    Events stored column by column, to hold long histories in little memory.
+
+    Repositories are kept once per table and states are interned, while event
+    types and flags are stored as small ints. Rows are read through `EventRow`
+    views, and only built back into `GithubEvent`s on demand. Rows of another
+    table can be appended like events.
+    """
+
+    __slots__ = (
+        "_committed_by_others",
+        "_event_types",
+        "_merged",
+        "_repositories",
+        "_repository_codes",
+        "_repository_columns",
+        "created_at",
+        "descriptions",
+        "ids",
+        "reviews",
+        "shas",
+        "states",
+        "titles",
+        "updated_at",
+        "urls",
+    )
+
+    def __init__(self, events: Iterable["Event"] = ()) -> None:
+        self.ids: list[str] = []
+        self.titles: list[str] = []
+        self.descriptions: list[str | None] = []
+        self.urls: list[str] = []
+        self.created_at: list[datetime] = []
+        self.updated_at: list[datetime | None] = []
+        self.shas: list[str | None] = []
+        self.states: list[str | None] = []
+        # Only reviews have any, so they're kept by row.
+        self.reviews: dict[int, list[GithubReview]] = {}
+
+        self._repositories: list[Repository] = []
+        self._repository_codes: dict[str, int] = {}
+        self._repository_columns = array("I")
+        self._event_types = array("B")
+        self._merged = array("b")
+        self._committed_by_others = array("B")
+
+        self.extend(events)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> "EventRow":
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return EventRow(self, index % len(self))
+
+    def __iter__(self) -> Iterator["EventRow"]:
+        return (EventRow(self, index) for index in range(len(self)))
+
+    def append(self, event: "Event") -> None:
+        index = len(self)
+
+        self.ids.append(event.id)
+        self.titles.append(event.title)
+        self.descriptions.append(event.description)
+        self.urls.append(event.url)
+        self.created_at.append(event.created_at)
+        self.updated_at.append(event.updated_at)
+        self.shas.append(event.sha)
+        self.states.append(sys.intern(event.state) if event.state else event.state)
+        if event.reviews:
+            self.reviews[index] = event.reviews
+
+        name = str(event.repository)
+        if (code := self._repository_codes.get(name)) is None:
+            code = self._repository_codes[name] = len(self._repositories)
+            self._repositories.append(event.repository)
+        self._repository_columns.append(code)
+
+        self._event_types.append(_EVENT_TYPE_CODES[event.event_type])
+        self._merged.append(_MERGED_CODES[event.merged])
+        self._committed_by_others.append(event.committed_by_others)
+
+    def extend(self, events: Iterable["Event"]) -> None:
+        for event in events:
+            self.append(event)
+
+    def repository(self, index: int) -> Repository:
+        return self._repositories[self._repository_columns[index]]
+
+    def event_type(self, index: int) -> EventType:
+        return _EVENT_TYPES[self._event_types[index]]
+
+    def merged(self, index: int) -> bool | None:
+        merged = self._merged[index]
+        return None if merged < 0 else bool(merged)
+
+    def committed_by_others(self, index: int) -> bool:
+        return bool(self._committed_by_others[index])
+
+    def event(self, index: int) -> GithubEvent:
+        """Build the `GithubEvent` of a row back, without validating it again."""
+
+        return GithubEvent.model_construct(
+            id=self.ids[index],
+            title=self.titles[index],
+            description=self.descriptions[index],
+            merged=self.merged(index),
+            url=self.urls[index],
+            created_at=self.created_at[index],
+            updated_at=self.updated_at[index],
+            repository=self.repository(index),
+            sha=self.shas[index],
+            event_type=self.event_type(index),
+            committed_by_others=self.committed_by_others(index),
+            state=self.states[index],
+            reviews=list(self.reviews.get(index, ())),
+        )
+
+    def events(self) -> list[GithubEvent]:
+        return [self.event(index) for index in range(len(self))]
+
+
+class EventRow:
+    """A row of an `EventTable`, read like a `GithubEvent`."""
+
+    __slots__ = ("index", "table")
+
+    def __init__(self, table: EventTable, index: int) -> None:
+        self.table = table
+        self.index = index
+
+    @property
+    def id(self) -> str:
+        return self.table.ids[self.index]
+
+    @property
+    def title(self) -> str:
+        return self.table.titles[self.index]
+
+    @property
+    def description(self) -> str | None:
+        return self.table.descriptions[self.index]
+
+    @property
+    def merged(self) -> bool | None:
+        return self.table.merged(self.index)
+
+    @property
+    def url(self) -> str:
+        return self.table.urls[self.index]
+
+    @property
+    def created_at(self) -> datetime:
+        return self.table.created_at[self.index]
+
+    @property
+    def updated_at(self) -> datetime | None:
+        return self.table.updated_at[self.index]
+
+    @property
+    def repository(self) -> Repository:
+        return self.table.repository(self.index)
+
+    @property
+    def sha(self) -> str | None:
+        return self.table.shas[self.index]
+
+    @property
+    def event_type(self) -> EventType:
+        return self.table.event_type(self.index)
+
+    @property
+    def committed_by_others(self) -> bool:
+        return self.table.committed_by_others(self.index)
+
+    @property
+    def state(self) -> str | None:
+        return self.table.states[self.index]
+
+    @property
+    def reviews(self) -> list[GithubReview]:
+        return self.table.reviews.get(self.index, [])
+
+    def to_event(self) -> GithubEvent:
+        return self.table.event(self.index)
+
+    def __str__(self) -> str:
+        return f"{self.title} @{self.repository} - {self.created_at}"
 
     @classmethod
-    def from_event(cls: type[Self], event: GithubEvent) -> Self:
-        return cls(
-            title=pydash.get(event.title.strip().splitlines(), "0", ""),
-            repository_url=event.repository.repository_url,
-            event_url=event.url.strip(),
-            event_type=event.event_type,
-            organization=str(event.repository),
-            state=event.state.title() if event.state else None,
-            description=event.description,
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> CoreSchema:
+        # Rows are taken as they are, and serialized like their event.
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls.to_event, return_schema=handler.generate_schema(GithubEvent)
+            ),
         )
 
 
+# Summaries read events the same way, whether they're held as models or rows.
+Event = GithubEvent | EventRow
+
+
+_events = TypeAdapter(list[GithubEvent])
+
+# The single type of event some sources return.
+_SOURCE_EVENT_TYPES = {
+    EventSource.REVIEWS: EventType.REVIEW,
+    EventSource.COMMITS: EventType.COMMIT,
+    EventSource.TAGS: EventType.TAG,
+    EventSource.COMMENTS: EventType.COMMENT,
+}
+
+
+def validate_events(items: list[dict], source: EventSource) -> list[GithubEvent]:
+    """
+    Validate a page of raw events of `source`.
+
+    When `source` only returns one type of event, it isn't guessed per event.
+    Pages aren't validated any faster than their events one by one: building
+    each `GithubEvent` dominates, rather than its aliases or event type. Schemas
+    specialized per source don't help either, as pydantic validates any schema
+    of `GithubEvent` with the model's own validator.
+    """
+
+    return _events.validate_python(
+        items, context={"event_type": _SOURCE_EVENT_TYPES.get(source)}
+    )
+
+
 class RepositoryEvents(BaseModel):
     repository: str
     organization: str
-    events: list[GithubEvent] = Field(default_factory=list[GithubEvent])
+    events: Sequence[Event] = Field(default_factory=list[Event])
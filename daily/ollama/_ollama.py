@@ -3,7 +3,12 @@
 # Author: Ben Mezger <me@benmezger.nl>
 # Created at <2025-03-01 Sat 12:56>
 
-from ollama import Client
+from time import perf_counter
+
+from ollama import ChatResponse, Client, ResponseError
+
+from .. import metrics
+from ..profiling import profiled
 
 
 class Ollama:
@@ -11,8 +16,36 @@ class Ollama:
         self._model = model
         self.client = Client(host=host)
 
+    @profiled("ollama.chat")
     def chat(self, message: str) -> str:
-        response = self.client.chat(
-            model=self._model, messages=[{"role": "user", "content": message}]
-        )
+        started_at = perf_counter()
+        response: ChatResponse | None = None
+        status = "error"
+        try:
+            response = self.client.chat(
+                model=self._model, messages=[{"role": "user", "content": message}]
+            )
+            status = "200"
+        except ResponseError as exc:
+            status = str(exc.status_code)
+            raise
+        finally:
+            self._record_request(started_at, status, response)
+
         return response.message.content or ""
+
+    def _record_request(
+        self, started_at: float, status: str, response: ChatResponse | None
+    ) -> None:
+        if not (recorder := metrics.current()):
+            return
+
+        labels = {"service": "ollama", "source": "", "endpoint": "/api/chat"}
+        recorder.inc("requests_total", status=status, **labels)
+        recorder.observe(
+            "request_duration_seconds", perf_counter() - started_at, **labels
+        )
+        if response and response.message.content:
+            recorder.inc(
+                "response_bytes_total", len(response.message.content.encode()), **labels
+            )
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 18:40>
+
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from collections.abc import AsyncGenerator, AsyncIterable, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from typing import ParamSpec, TextIO, TypeVar
+
+from pydantic import BaseModel
+
+from ._wrapping import wrap_iterable
+
+
+class Span(BaseModel):
+    """Every time a phase of a run was entered, summed up."""
+
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class Profiler:
+    """
+    Time the phases of a run and track its peak memory.
+
+    Spans with the same name are summed up. Sources and Ollama calls run
+    concurrently, so the time of their spans is wall time and may add up to
+    more than the run took.
+
+    Peak memory is the process' peak resident size. Tracing allocations
+    instead measures the peak allocated by Python, but slows down the CPU
+    bound phases the most, so it's only done when asked for.
+    """
+
+    def __init__(self, trace_allocations: bool = False) -> None:
+        self.spans: dict[str, Span] = {}
+        self.trace_allocations = trace_allocations
+        self._started_at = 0.0
+        self._seconds = 0.0
+        self._peak_memory = 0
+
+    def start(self) -> None:
+        if self.trace_allocations:
+            tracemalloc.start()
+        self._started_at = time.perf_counter()
+
+    def stop(self) -> None:
+        self._seconds = time.perf_counter() - self._started_at
+        if self.trace_allocations:
+            self._peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            self._peak_memory = _peak_resident_size()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started_at
+            span = self.spans.get(name) or self.spans.setdefault(name, Span(name=name))
+            span.calls += 1
+            span.seconds += elapsed
+            span.max_seconds = max(span.max_seconds, elapsed)
+
+    def report(self) -> dict:
+        return {
+            "seconds": self._seconds,
+            "peak_memory_bytes": self._peak_memory,
+            "peak_memory": "allocated" if self.trace_allocations else "resident",
+            "spans": [
+                span.model_dump()
+                for span in sorted(self.spans.values(), key=lambda s: -s.seconds)
+            ],
+        }
+
+    def write_json(self, file: TextIO) -> None:
+        json.dump(self.report(), file, indent=2)
+        file.write("\n")
+
+    def write_table(self, file: TextIO) -> None:
+        file.write(
+            f"Profiled {self._seconds:.3f}s, "
+            f"peak {'allocated' if self.trace_allocations else 'resident'} memory "
+            f"{self._peak_memory / 1024 / 1024:.1f} MiB\n"
+        )
+        file.write(f"  {'span':<40}{'calls':>8}{'total (s)':>12}{'max (s)':>10}\n")
+        for span in sorted(self.spans.values(), key=lambda s: -s.seconds):
+            file.write(
+                f"  {span.name:<40}{span.calls:>8}{span.seconds:>12.3f}"
+                f"{span.max_seconds:>10.3f}\n"
+            )
+
+
+def _peak_resident_size() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+P = ParamSpec("P")
+R = TypeVar("R")
+T = TypeVar("T")
+
+_profiler: ContextVar[Profiler | None] = ContextVar("profiler", default=None)
+_untimed = nullcontext()
+
+
+def enable(profiler: Profiler) -> None:
+    """Record the spans of this context, and of the tasks and threads it starts."""
+
+    _profiler.set(profiler)
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """Time a phase of the run, when profiling."""
+
+    if profiler := _profiler.get():
+        return profiler.span(name)
+    return _untimed
+
+
+def profiled(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    def decorator(f: Callable[P, R]) -> Callable[P, R]:
+        @wraps(f)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with span(name):
+                return f(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def profiled_iterable(
+    name: str,
+) -> Callable[[Callable[P, AsyncIterable[T]]], Callable[P, AsyncIterable[T]]]:
+    """Time an async iterable from its first item until it's exhausted or closed."""
+
+    async def timed(iterable: AsyncIterable[T]) -> AsyncGenerator[T, None]:
+        with span(name):
+            async for item in iterable:
+                yield item
+
+    return wrap_iterable(timed)
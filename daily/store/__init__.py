@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 13:20>
+
+from ._store import EventStore
+
+__all__ = ["EventStore"]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 13:20>
+
+import sqlite3
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, time, timedelta
+from pathlib import Path
+
+from daily.models import EventSource, EventType, GithubEvent
+
+# Github's search index lags behind a little, so a day is only considered fully
+# synced once it has been fetched a while after it ended.
+SYNC_GRACE_PERIOD = timedelta(hours=1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    scope TEXT NOT NULL,
+    source TEXT NOT NULL,
+    day TEXT NOT NULL,
+    id TEXT NOT NULL,
+    repository TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (scope, source, day, id)
+);
+CREATE INDEX IF NOT EXISTS events_by_day ON events (scope, day);
+CREATE INDEX IF NOT EXISTS events_by_repository ON events (repository);
+CREATE INDEX IF NOT EXISTS events_by_event_type ON events (event_type);
+
+CREATE TABLE IF NOT EXISTS watermarks (
+    scope TEXT NOT NULL,
+    source TEXT NOT NULL,
+    day TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (scope, source, day)
+);
+"""
+
+
+class EventStore:
+    """
+    Local SQLite store of fetched Github events.
+
+    Events are stored per `scope` (an account and its exclusions), source and
+    day. Every time a source is synced for a day, a watermark records when it
+    happened, so days that were synced after they ended never need to be fetched
+    again.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def synced_at(self, scope: str, source: EventSource, day: date) -> datetime | None:
+        row = self._connection.execute(
+            "SELECT synced_at FROM watermarks WHERE scope = ? AND source = ? "
+            "AND day = ?",
+            (scope, source.value, day.isoformat()),
+        ).fetchone()
+
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def is_synced(self, scope: str, source: EventSource, day: date) -> bool:
+        if not (synced_at := self.synced_at(scope, source, day)):
+            return False
+
+        day_end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=UTC)
+        return synced_at >= day_end + SYNC_GRACE_PERIOD
+
+    def events(
+        self,
+        scope: str,
+        day: date,
+        source: EventSource | None = None,
+        event_types: Iterable[EventType] | None = None,
+    ) -> list[GithubEvent]:
+        query = "SELECT payload FROM events WHERE scope = ? AND day = ?"
+        params: list[str] = [scope, day.isoformat()]
+
+        if source:
+            query += " AND source = ?"
+            params.append(source.value)
+
+        if event_types is not None:
+            values = [event_type.value for event_type in event_types]
+            query += f" AND event_type IN ({', '.join('?' * len(values))})"
+            params.extend(values)
+
+        return [
+            GithubEvent.model_validate_json(payload)
+            for (payload,) in self._connection.execute(
+                query + " ORDER BY rowid", params
+            )
+        ]
+
+    def save(
+        self,
+        scope: str,
+        source: EventSource,
+        day: date,
+        events: Iterable[GithubEvent],
+        synced_at: datetime | None = None,
+    ) -> None:
+        """Replace the events of `source` on `day` and move its watermark."""
+
+        synced_at = synced_at or datetime.now(UTC)
+
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM events WHERE scope = ? AND source = ? AND day = ?",
+                (scope, source.value, day.isoformat()),
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO events "
+                "(scope, source, day, id, repository, event_type, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        scope,
+                        source.value,
+                        day.isoformat(),
+                        event.id,
+                        str(event.repository),
+                        event.event_type.value,
+                        event.model_dump_json(exclude_none=True),
+                    )
+                    for event in events
+                ),
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO watermarks (scope, source, day, synced_at) "
+                "VALUES (?, ?, ?, ?)",
+                (scope, source.value, day.isoformat(), synced_at.isoformat()),
+            )
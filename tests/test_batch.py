@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 15:40>
+
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pydantic
+import pytest
+from click.testing import CliRunner
+
+from daily import _cli
+from daily._batch import load_batch_config
+from daily.exceptions import DailySummaryUnauthorizedError
+from daily.github import Exclusions, Github
+from daily.github._cache import token_fingerprint
+from daily.github._rate_limit import RateLimit
+from daily.models import Account, EventTable
+
+
+def test_load_batch_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("WORK_TOKEN", "secret")
+    config = tmp_path / "batch.toml"
+    config.write_text(
+        """
+[[accounts]]
+token_env = "WORK_TOKEN"
+username = "benmezger"
+exclude_organizations = ["benmezger"]
+output = "daily-work.md"
+
+[[accounts]]
+token_env = "PERSONAL_TOKEN"
+username = "benmezger"
+exclude_repositories = ["benmezger/summaries"]
+output = "daily-personal.md"
+"""
+    )
+
+    work, personal = load_batch_config(config).accounts
+
+    assert (work.token, work.exclude_organizations) == ("secret", ["benmezger"])
+    assert work.output == Path("daily-work.md")
+    assert personal.token is None
+    assert personal.exclude_repositories == ["benmezger/summaries"]
+
+
+def test_load_batch_config_rejects_invalid_repositories(tmp_path: Path):
+    config = tmp_path / "batch.toml"
+    config.write_text(
+        """
+[[accounts]]
+token_env = "TOKEN"
+username = "benmezger"
+exclude_repositories = ["summaries"]
+output = "daily.md"
+"""
+    )
+
+    with pytest.raises(pydantic.ValidationError, match="username/repository"):
+        load_batch_config(config)
+
+
+def test_batch_writes_the_accounts_that_did_not_fail(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("GOOD_TOKEN", "good")
+    monkeypatch.setenv("EXPIRED_TOKEN", "expired")
+    config = tmp_path / "batch.toml"
+    config.write_text(
+        f"""
+[[accounts]]
+token_env = "EXPIRED_TOKEN"
+username = "benmezger"
+output = "{tmp_path / "expired.md"}"
+
+[[accounts]]
+token_env = "GOOD_TOKEN"
+username = "benmezger"
+output = "{tmp_path / "good.md"}"
+"""
+    )
+
+    async def fetch_events(
+        github: Github, date: datetime, exclusions: Exclusions, **kwargs
+    ) -> EventTable:
+        if github.fingerprint == token_fingerprint("expired"):
+            raise DailySummaryUnauthorizedError("Bad credentials")
+        return EventTable()
+
+    monkeypatch.setattr(_cli, "fetch_events", fetch_events)
+    monkeypatch.setattr(
+        Github, "get_user", lambda self: Account(login="benmezger", name="Ben")
+    )
+    reset_at = datetime(2025, 3, 16, tzinfo=UTC)
+    monkeypatch.setattr(
+        Github,
+        "rate_limits",
+        property(lambda self: {"search": RateLimit(30, 12, reset_at)}),
+    )
+
+    result = CliRunner().invoke(
+        _cli.cli,
+        ["--no-cache", "batch", str(config), "--no-ollama", "--no-store"],
+    )
+
+    assert result.exit_code == 1
+    assert "Failed to summarize benmezger (EXPIRED_TOKEN)" in result.output
+    assert "1 of 2 accounts failed" in result.output
+    # Both accounts report their own budget.
+    for token_env in ("EXPIRED_TOKEN", "GOOD_TOKEN"):
+        assert f"budget left for benmezger ({token_env}):" in result.output
+    assert (tmp_path / "good.md").exists()
+    assert not (tmp_path / "expired.md").exists()
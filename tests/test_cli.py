@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 22:10>
+
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from daily import _cli
+from daily._cli import cli
+from daily.github import Exclusions, Github
+from daily.models import Account, EventTable, GithubEvent
+
+
+@pytest.mark.parametrize(
+    ("args", "message"),
+    (
+        (["daily-summary", "--to", "2025-01-31"], "--to: requires --from"),
+        (["daily-summary", "--from", "2025-01-01", "-y"], "with --yesterday"),
+        (["daily-summary", "--from", "2025-01-01", "-d", "2025-01-02"], "with --date"),
+        (["-f", "out.md", "daily-summary", "--from", "2025-01-01"], "with --file"),
+    ),
+)
+def test_daily_summary_rejects_options_ignored_by_backfills(
+    args: list[str], message: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(cli, ["--token", "token", "--no-cache", *args])
+
+    assert result.exit_code == 2
+    assert message in result.output
+
+
+def test_daily_summary_backfills_a_single_day_to_the_output_dir(
+    account: Account,
+    github_events: list[GithubEvent],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    async def fetch_events_by_day(
+        github: Github, since: datetime, until: datetime, exclusions: Exclusions, **_
+    ) -> dict[date, EventTable]:
+        assert since == until
+        return {since.date(): EventTable(github_events)}
+
+    monkeypatch.setattr(_cli, "fetch_events_by_day", fetch_events_by_day)
+    monkeypatch.setattr(Github, "get_user", lambda self: account)
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            *("--token", "token", "--no-cache", "daily-summary"),
+            *(
+                "--no-ollama",
+                "--no-store",
+                "--from",
+                "2025-03-16",
+                "--to",
+                "2025-03-16",
+            ),
+            *("--output-dir", str(tmp_path / "summaries")),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert result.output == ""
+    assert (tmp_path / "summaries" / "2025-03-16.md").exists()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 21:20>
+
+import io
+from datetime import date
+
+import pytest
+
+from daily._dump import read_dump, write_dump
+from daily._summary import write_summary
+from daily.models import Account, EventTable, RepositoryEvents
+
+
+def test_dump_round_trips_events(
+    account: Account, repository_events: list[RepositoryEvents]
+):
+    file = io.StringIO()
+    write_dump(file, account, date(2025, 3, 16), repository_events)
+    file.seek(0)
+
+    dumped_account, dumped_date, events = read_dump(file)
+
+    assert dumped_account == account
+    assert dumped_date == date(2025, 3, 16)
+    assert list(events) == repository_events
+    # One header line, then one line per repository.
+    assert len(file.getvalue().splitlines()) == 1 + len(repository_events)
+
+
+def test_rendered_dump_matches_summary(
+    account: Account, repository_events: list[RepositoryEvents]
+):
+    # Rows of an `EventTable` are dumped as the events they hold.
+    table_events = [
+        evts.model_copy(update={"events": list(EventTable(evts.events))})
+        for evts in repository_events
+    ]
+    file = io.StringIO()
+    write_dump(file, account, date(2025, 3, 16), table_events)
+    file.seek(0)
+
+    dumped_account, dumped_date, events = read_dump(file)
+    rendered, expected = io.StringIO(), io.StringIO()
+    write_summary(dumped_account, list(events), None, rendered, dumped_date)
+    write_summary(account, repository_events, None, expected, date(2025, 3, 16))
+
+    assert rendered.getvalue() == expected.getvalue()
+
+
+def test_read_dump_rejects_empty_files():
+    with pytest.raises(ValueError):
+        read_dump(io.StringIO())
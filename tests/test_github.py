@@ -0,0 +1,1013 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 10:12>
+
+import asyncio
+import contextvars
+import io
+import json
+import os
+import re
+import time
+from collections.abc import AsyncIterable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any
+
+import httpx
+import pytest
+import tenacity
+
+from daily import metrics
+from daily._pipeline import collect
+from daily.exceptions import DailySummaryError, DailySummaryQueryError
+from daily.github import (
+    AccountCache,
+    Exclusions,
+    Github,
+    QueryProfile,
+    RecordingTransport,
+    ReplayTransport,
+    RequestScheduler,
+    ResponseCache,
+)
+from daily.github._rate_limit import RateLimitGovernor
+from daily.models import (
+    EventSource,
+    EventType,
+    GithubEvent,
+    Repository,
+    validate_events,
+)
+
+
+def _issue(i: int) -> dict:
+    return {
+        "id": f"I_{i}",
+        "title": f"Issue {i}",
+        "url": f"https://github.com/acme/app/issues/{i}",
+        "repository": {"nameWithOwner": "acme/app"},
+        "createdAt": "2025-03-16T10:00:00Z",
+        "updatedAt": "2025-03-16T10:00:00Z",
+        "state": "OPEN",
+    }
+
+
+def _search_page(nodes: list[dict], cursor: str | None) -> dict:
+    return {
+        "data": {
+            "search": {
+                "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+                "edges": [{"node": node} for node in nodes],
+            }
+        }
+    }
+
+
+def _scheduler(handler: Callable[[httpx.Request], httpx.Response]) -> RequestScheduler:
+    scheduler = RequestScheduler()
+    scheduler.transport = scheduler.atransport = httpx.MockTransport(handler)
+    return scheduler
+
+
+@pytest.fixture
+def make_github() -> Callable[..., Github]:
+    def factory(
+        handler: Callable[[httpx.Request], httpx.Response], **kwargs: Any
+    ) -> Github:
+        return Github(
+            "token", username="benmezger", scheduler=_scheduler(handler), **kwargs
+        )
+
+    return factory
+
+
+def _collect(events: AsyncIterable[GithubEvent]) -> list[GithubEvent]:
+    async def collect() -> list[GithubEvent]:
+        return [event async for event in events]
+
+    return asyncio.run(collect())
+
+
+def test_issues_from_follows_cursors(make_github):
+    pages = {
+        "null": _search_page([_issue(1), _issue(2)], "cursor-1"),
+        '"cursor-1"': _search_page([_issue(3)], "cursor-2"),
+        '"cursor-2"': _search_page([_issue(4)], None),
+    }
+    cursors = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        cursor = query.split("after: ")[1].splitlines()[0]
+        cursors.append(cursor)
+        return httpx.Response(200, json=pages[cursor])
+
+    github = make_github(handler)
+    events = _collect(github.issues_from(datetime(2025, 3, 16), Exclusions()))
+
+    assert [event.id for event in events] == ["I_1", "I_2", "I_3", "I_4"]
+    assert cursors == ["null", '"cursor-1"', '"cursor-2"']
+
+
+def test_searches_over_the_results_limit_are_split_by_days(make_github):
+    searched = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        days = re.findall(r"created:([\d.-]+)", json.loads(request.content)["query"])[0]
+        searched.append(days)
+        page = _search_page([_issue(len(searched))], None)
+        # Every single day matches few enough.
+        page["data"]["search"]["issueCount"] = 1 if ".." not in days else 1500
+        return httpx.Response(200, json=page)
+
+    github = make_github(handler)
+    events = _collect(
+        github.issues_from(
+            datetime(2025, 3, 1), Exclusions(), until=datetime(2025, 3, 3)
+        )
+    )
+
+    assert searched == [
+        "2025-03-01..2025-03-03",
+        "2025-03-01..2025-03-02",
+        "2025-03-01",
+        "2025-03-02",
+        "2025-03-03",
+    ]
+    assert [event.id for event in events] == ["I_3", "I_4", "I_5"]
+
+
+def test_searches_of_a_day_over_the_results_limit_warn(make_github):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/search/commits":
+            return httpx.Response(200, json={"total_count": 1500, "items": []})
+        return httpx.Response(200, json={"data": {"nodes": []}})
+
+    github = make_github(handler)
+
+    with pytest.warns(UserWarning, match="1000 of the 1500 events"):
+        _collect(github.commits_from(datetime(2025, 3, 16), Exclusions()))
+
+
+def test_issues_from_stops_fetching_when_consumer_stops(make_github):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=_search_page([_issue(len(requests))], "next"))
+
+    github = make_github(handler)
+
+    async def first_event() -> GithubEvent:
+        async for event in github.issues_from(datetime(2025, 3, 16), Exclusions()):
+            return event
+        raise AssertionError("no events")
+
+    assert asyncio.run(first_event()).id == "I_1"
+    # At most the prefetched page was requested on top of the first one.
+    assert len(requests) <= 2
+
+
+def _commit(i: int) -> dict:
+    return {
+        "node_id": f"C_{i}",
+        "sha": f"sha-{i}",
+        "url": f"https://api.github.com/repos/acme/app/commits/sha-{i}",
+        "html_url": f"https://github.com/acme/app/commit/sha-{i}",
+        "commit": {
+            "message": f"Commit {i}",
+            "committer": {"date": "2025-03-16T10:00:00Z"},
+        },
+        "repository": {"full_name": "acme/app"},
+    }
+
+
+def test_commits_from_resolves_signatures_in_batches(make_github):
+    batches = []
+    rest_urls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/search/commits":
+            return httpx.Response(200, json={"items": [_commit(i) for i in range(3)]})
+
+        if request.url.path == "/graphql":
+            ids = json.loads(request.content)["variables"]["ids"]
+            batches.append(ids)
+            nodes = {
+                "C_0": {"signature": {"isValid": True}},
+                "C_1": {"signature": None},
+                "C_2": None,
+            }
+            return httpx.Response(
+                200, json={"data": {"nodes": [nodes[i] for i in ids]}}
+            )
+
+        rest_urls.append(str(request.url))
+        return httpx.Response(
+            200, json={"commit": {"verification": {"verified": True}}}
+        )
+
+    github = make_github(handler)
+    events = _collect(github.commits_from(datetime(2025, 3, 16), Exclusions()))
+
+    assert batches == [["C_0", "C_1", "C_2"]]
+    assert rest_urls == ["https://api.github.com/repos/acme/app/commits/sha-2"]
+    assert {event.id: event.committed_by_others for event in events} == {
+        "C_0": False,
+        "C_1": True,
+        "C_2": False,
+    }
+
+
+def test_commits_from_searches_a_date_range_across_pages(make_github):
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/search/commits":
+            queries.append(request.url.params["q"])
+            if request.url.params.get("page") == "2":
+                return httpx.Response(200, json={"items": [_commit(1)]})
+            return httpx.Response(
+                200,
+                json={"items": [_commit(0)]},
+                headers={"Link": f'<{request.url}&page=2>; rel="next"'},
+            )
+
+        ids = json.loads(request.content)["variables"]["ids"]
+        return httpx.Response(
+            200,
+            json={"data": {"nodes": [{"signature": {"isValid": True}} for _ in ids]}},
+        )
+
+    github = make_github(handler)
+    events = _collect(
+        github.commits_from(
+            datetime(2025, 3, 1), Exclusions(), until=datetime(2025, 3, 16)
+        )
+    )
+
+    assert [event.id for event in events] == ["C_0", "C_1"]
+    assert len(queries) == 2
+    assert "committer-date:2025-03-01..2025-03-16" in queries[0]
+
+
+def test_reviews_from_yields_a_review_per_day(make_github):
+    def review(updated_at: str, login: str = "benmezger") -> dict:
+        return {
+            "author": {"login": login},
+            "createdAt": updated_at,
+            "updatedAt": updated_at,
+            "state": "COMMENTED",
+        }
+
+    pull_request = _issue(1) | {
+        "id": "PR_1",
+        "reviews": {
+            "nodes": [
+                review("2025-03-02T09:00:00Z"),
+                review("2025-03-02T15:00:00Z"),
+                review("2025-03-04T10:00:00Z", login="someone-else"),
+                review("2025-03-05T10:00:00Z"),
+                review("2025-03-20T10:00:00Z"),
+            ]
+        },
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert "updated:2025-03-01..2025-03-16" in json.loads(request.content)["query"]
+        return httpx.Response(200, json=_search_page([pull_request], None))
+
+    github = make_github(handler)
+    events = _collect(
+        github.reviews_from(
+            datetime(2025, 3, 1), Exclusions(), until=datetime(2025, 3, 16)
+        )
+    )
+
+    assert [event.updated_at for event in events] == [
+        datetime.fromisoformat("2025-03-02T15:00:00Z"),
+        datetime.fromisoformat("2025-03-05T10:00:00Z"),
+    ]
+
+
+def test_request_scheduler_bounds_in_flight_requests():
+    scheduler = RequestScheduler(max_in_flight=2)
+    in_flight = peak = 0
+
+    async def request() -> None:
+        nonlocal in_flight, peak
+        async with scheduler.aslot():
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def run() -> None:
+        await asyncio.gather(*(request() for _ in range(6)))
+
+    asyncio.run(run())
+
+    assert peak == 2
+
+
+def test_request_scheduler_shares_slots_between_threads_and_tasks():
+    scheduler = RequestScheduler(max_in_flight=1)
+    order = []
+
+    async def run() -> None:
+        with scheduler.slot():
+            waiting = asyncio.create_task(request())
+            await asyncio.sleep(0.05)
+            order.append("thread")
+        await waiting
+
+    async def request() -> None:
+        async with scheduler.aslot():
+            order.append("task")
+
+    asyncio.run(run())
+
+    assert order == ["thread", "task"]
+
+
+def test_request_scheduler_keeps_executor_free_for_slot_holders():
+    scheduler = RequestScheduler(max_in_flight=1)
+    done = 0
+
+    async def request() -> None:
+        nonlocal done
+        async with scheduler.aslot():
+            # Such as resolving the host, before connecting.
+            await asyncio.to_thread(time.sleep, 0.001)
+            done += 1
+
+    async def run() -> None:
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=2)
+        )
+        await asyncio.wait_for(asyncio.gather(*(request() for _ in range(8))), 5)
+
+    asyncio.run(run())
+
+    assert done == 8
+
+
+def _rate_limited_response(status_code: int = 200, **headers: str) -> httpx.Response:
+    return httpx.Response(
+        status_code,
+        headers={key.replace("_", "-"): value for key, value in headers.items()},
+        request=httpx.Request("GET", "https://api.github.com/search/commits"),
+    )
+
+
+def _throttled(governor: RateLimitGovernor, resource: str) -> float:
+    delays = [0.0]
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(time, "sleep", delays.append)
+        governor.throttle(resource)
+    return delays[-1]
+
+
+def test_rate_limit_governor_tracks_budget_per_resource():
+    governor = RateLimitGovernor()
+    governor.update(
+        _rate_limited_response(
+            x_ratelimit_resource="search",
+            x_ratelimit_limit="30",
+            x_ratelimit_remaining="12",
+            x_ratelimit_reset=str(int(time.time()) + 60),
+        )
+    )
+    governor.update_graphql(
+        {"limit": 5000, "cost": 1, "remaining": 4999, "resetAt": "2099-01-01T00:00:00Z"}
+    )
+
+    assert governor.budgets["search"].remaining == 12
+    assert governor.budgets["graphql"].remaining == 4999
+    assert _throttled(governor, "search") == 0
+    assert governor.budgets["search"].remaining == 11
+
+
+def test_rate_limit_governor_waits_for_reset_when_budget_is_spent():
+    governor = RateLimitGovernor()
+    reset = int(time.time()) + 30
+    governor.update(
+        _rate_limited_response(
+            x_ratelimit_limit="30",
+            x_ratelimit_remaining="1",
+            x_ratelimit_reset=str(reset),
+        )
+    )
+
+    assert 25 < _throttled(governor, "search") <= 30
+    assert _throttled(governor, "core") == 0
+
+
+def test_rate_limit_governor_paces_low_budget():
+    governor = RateLimitGovernor()
+    governor.update(
+        _rate_limited_response(
+            x_ratelimit_limit="30",
+            x_ratelimit_remaining="3",
+            x_ratelimit_reset=str(int(time.time()) + 60),
+        )
+    )
+
+    first, second = _throttled(governor, "search"), _throttled(governor, "search")
+
+    assert first == 0
+    assert 15 < second <= 20
+
+
+def test_rate_limit_governor_honours_retry_after():
+    governor = RateLimitGovernor()
+    governor.update(_rate_limited_response(429, retry_after="10"))
+
+    assert 9 < _throttled(governor, "core") <= 10
+    assert 9 < _throttled(governor, "graphql") <= 10
+
+
+def test_get_requests_are_revalidated_with_etags(make_github, tmp_path):
+    conditional_headers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        conditional_headers.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200, json={"login": "benmezger", "name": "Ben"}, headers={"ETag": '"v1"'}
+        )
+
+    cache = ResponseCache(tmp_path)
+
+    first = make_github(handler, cache=cache).get_user()
+    second = make_github(handler, cache=cache).get_user()
+
+    assert conditional_headers == [None, '"v1"']
+    assert first == second
+    assert first.username == "benmezger"
+
+
+def test_response_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=200)
+
+    def response(i: int) -> httpx.Response:
+        return httpx.Response(200, json={"i": i}, headers={"ETag": f'"{i}"'})
+
+    cache.put("first", response(1))
+    cache.put("second", response(2))
+    # Make "first" the most recently used entry, then overflow the cache.
+    for path in tmp_path.glob("*.json"):
+        os.utime(path, (0, 0))
+    assert cache.get("first") is not None
+    cache.put("third", response(3))
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+    assert cache.size() <= 200
+
+
+def test_response_cache_evicts_below_its_cap(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=2000)
+    evictions = 0
+
+    for i in range(100, 200):
+        entries = len(list(tmp_path.glob("*.json")))
+        cache.put(f"key-{i}", httpx.Response(200, json={"i": i}, headers={"ETag": "1"}))
+        evictions += len(list(tmp_path.glob("*.json"))) <= entries
+
+    assert cache.size() <= 2000
+    # Entries are all the same size, and each eviction frees room for a couple.
+    entry_size = next(tmp_path.glob("*.json")).stat().st_size
+    overflowing_puts = 100 - 2000 // entry_size
+    assert 0 < evictions <= overflowing_puts // 2
+
+
+def test_prefetch_combines_first_pages_in_a_single_query(make_github):
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        queries.append(query)
+
+        if "issues: search" in query:
+            return httpx.Response(
+                200,
+                json={
+                    "data": {
+                        "issues": _search_page([_issue(1)], "cursor-1")["data"][
+                            "search"
+                        ],
+                        "reviews": _search_page([], None)["data"]["search"],
+                    }
+                },
+            )
+        return httpx.Response(200, json=_search_page([_issue(2)], None))
+
+    github = make_github(handler)
+
+    async def run() -> tuple[list[GithubEvent], list[GithubEvent]]:
+        date = datetime(2025, 3, 16)
+        github.prefetch(date, [EventSource.ISSUES, EventSource.REVIEWS], Exclusions())
+        return await asyncio.gather(
+            collect(github.issues_from(date, Exclusions())),
+            collect(github.reviews_from(date, Exclusions())),
+        )
+
+    issues, reviews = asyncio.run(run())
+
+    assert [event.id for event in issues] == ["I_1", "I_2"]
+    assert reviews == []
+    # One combined query for both first pages, then the second page of issues.
+    assert len(queries) == 2
+    assert '"cursor-1"' in queries[1]
+
+
+def _tag(name: str, date: str, committed_at: str | None = None) -> dict:
+    target = {"tagger": {"date": date}, "target": {"committedDate": committed_at}}
+    return {"node": {"name": name, "target": target}}
+
+
+def _repository(name: str, pushed_at: str, tags: list[dict], cursor=None) -> dict:
+    return {
+        "node": {
+            "nameWithOwner": name,
+            "pushedAt": pushed_at,
+            "refs": {
+                "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+                "edges": tags,
+            },
+        }
+    }
+
+
+def test_tags_from_stops_at_stale_repositories_and_tags(make_github):
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        queries.append(query)
+
+        if "repository(" in query:
+            return httpx.Response(
+                200,
+                json={
+                    "data": {
+                        "repository": {
+                            "refs": {
+                                "pageInfo": {"hasNextPage": True, "endCursor": "t2"},
+                                "edges": [
+                                    _tag("v1.1", "2025-03-16T08:00:00+00:00"),
+                                    _tag("v1.0", "2025-03-01T08:00:00+00:00"),
+                                ],
+                            }
+                        }
+                    }
+                },
+            )
+
+        repositories = [
+            _repository(
+                "acme/app",
+                "2025-03-16T12:00:00Z",
+                [
+                    _tag("v2.0", "2025-03-17T08:00:00+00:00"),
+                    _tag("v1.2", "2025-03-16T09:00:00+00:00"),
+                ],
+                cursor="t1",
+            ),
+            _repository("acme/old", "2025-01-01T00:00:00Z", []),
+        ]
+        return httpx.Response(
+            200,
+            json={
+                "data": {
+                    "viewer": {
+                        "repositories": {
+                            "pageInfo": {"hasNextPage": True, "endCursor": "r1"},
+                            "edges": repositories,
+                        }
+                    }
+                }
+            },
+        )
+
+    github = make_github(handler)
+    events = _collect(github.tags_from(datetime(2025, 3, 16), Exclusions()))
+
+    assert [event.title for event in events] == ["Tagged v1.2", "Tagged v1.1"]
+    # The repositories and the second page of tags of acme/app, nothing else.
+    assert len(queries) == 2
+    assert '"t1"' in queries[1]
+
+
+def test_tags_from_finds_tags_of_older_commits(make_github):
+    def handler(request: httpx.Request) -> httpx.Response:
+        repository = _repository(
+            "acme/app",
+            "2025-03-16T12:00:00Z",
+            [
+                _tag("v1.3", "2025-03-15T23:00:00+00:00", "2025-03-15T22:00:00+00:00"),
+                # A backport, tagged within the day on an older commit.
+                _tag(
+                    "v1.2.1", "2025-03-16T10:00:00+00:00", "2025-03-12T21:00:00+00:00"
+                ),
+                _tag("v1.2", "2025-03-10T10:00:00+00:00", "2025-03-01T09:00:00+00:00"),
+                _tag("v1.1", "2025-03-16T11:00:00+00:00", "2025-02-01T09:00:00+00:00"),
+            ],
+            cursor="t1",
+        )
+        return httpx.Response(
+            200,
+            json={
+                "data": {
+                    "viewer": {
+                        "repositories": {
+                            "pageInfo": {"hasNextPage": False, "endCursor": None},
+                            "edges": [repository],
+                        }
+                    }
+                }
+            },
+        )
+
+    github = make_github(handler)
+    events = _collect(github.tags_from(datetime(2025, 3, 16), Exclusions()))
+
+    # Tags of commits made more than a week earlier are not looked for.
+    assert [event.title for event in events] == ["Tagged v1.2.1"]
+
+
+def test_contributions_from_requests_a_year_at_a_time(make_github):
+    windows = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        windows.append(query.split("contributionsCollection(")[1].split(")")[0])
+        return httpx.Response(
+            200, json={"data": {"user": {"contributionsCollection": {}}}}
+        )
+
+    github = make_github(handler)
+    _collect(
+        github.contributions_from(
+            datetime(2023, 1, 1), Exclusions(), until=datetime(2025, 1, 1)
+        )
+    )
+
+    assert windows == [
+        'from: "2023-01-01T00:00:00+00:00", to: "2024-01-01T00:00:00+00:00"',
+        'from: "2024-01-01T00:00:00+00:00", to: "2024-12-31T00:00:00+00:00"',
+        'from: "2024-12-31T00:00:00+00:00", to: "2025-01-02T00:00:00+00:00"',
+    ]
+
+
+def test_exclusions_match_literals_and_patterns():
+    exclusions = Exclusions(["Acme/App", "acme/*-infra"], ["old-org", "tmp-*"])
+
+    assert exclusions.excludes("acme/app")
+    assert exclusions.excludes("acme/cloud-infra")
+    assert exclusions.excludes("Old-Org/anything")
+    assert exclusions.excludes("tmp-2025/repo")
+    assert not exclusions.excludes("acme/application")
+    assert not exclusions.excludes("other/app")
+
+
+def test_exclusions_qualifiers_fit_in_the_search_query():
+    exclusions = Exclusions(["acme/app", "acme/*-infra"], ["old-org"])
+
+    assert exclusions.qualifiers(max_length=100) == ["-org:old-org", "-repo:acme/app"]
+    assert exclusions.qualifiers(max_length=20) == ["-org:old-org"]
+
+
+def test_issues_from_excludes_on_the_server(make_github):
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        queries.append(json.loads(request.content)["query"])
+        return httpx.Response(200, json=_search_page([_issue(1)], None))
+
+    github = make_github(handler)
+    events = _collect(
+        github.issues_from(datetime(2025, 3, 16), Exclusions(["acme/*"], ["old-org"]))
+    )
+
+    assert events == []
+    assert 'created:2025-03-16 -org:old-org"' in queries[0]
+
+
+@pytest.mark.parametrize(
+    ("profile", "selects_bodies"),
+    ((QueryProfile.MINIMAL, False), (QueryProfile.FULL, True)),
+)
+def test_query_profile_selects_bodies(profile: QueryProfile, selects_bodies: bool):
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        queries.append(json.loads(request.content)["query"])
+        return httpx.Response(200, json=_search_page([_issue(1)], None))
+
+    github = Github(
+        "token", username="benmezger", scheduler=_scheduler(handler), profile=profile
+    )
+    _collect(github.issues_from(datetime(2025, 3, 16), Exclusions()))
+
+    assert (" body\n" in queries[0]) is selects_bodies
+
+
+def test_comments_from_stops_at_comments_updated_before_the_day(make_github):
+    def comment(i: int, created_at: str, updated_at: str, repo: str) -> dict:
+        return {
+            "node": {
+                "url": f"https://github.com/{repo}/pull/1#issuecomment-{i}",
+                "createdAt": created_at,
+                "updatedAt": updated_at,
+                "repository": {"nameWithOwner": repo},
+                "issue": {"id": "I_1", "title": "Fix", "state": "OPEN"},
+                "pullRequest": {"id": "PR_1", "title": "Fix", "state": "OPEN"},
+            }
+        }
+
+    def page(edges: list[dict], cursor: str | None) -> dict:
+        return {
+            "data": {
+                "user": {
+                    "issueComments": {
+                        "pageInfo": {
+                            "hasNextPage": cursor is not None,
+                            "endCursor": cursor,
+                        },
+                        "edges": edges,
+                    }
+                }
+            }
+        }
+
+    pages = {
+        "null": page(
+            [
+                comment(1, "2025-03-17T09:00:00Z", "2025-03-17T09:00:00Z", "acme/app"),
+                comment(2, "2025-03-15T09:00:00Z", "2025-03-16T12:00:00Z", "acme/app"),
+                comment(3, "2025-03-16T10:00:00Z", "2025-03-16T10:00:00Z", "old/app"),
+                comment(4, "2025-03-16T09:00:00Z", "2025-03-16T09:00:00Z", "acme/app"),
+            ],
+            "cursor-1",
+        ),
+        '"cursor-1"': page(
+            [
+                comment(5, "2025-03-16T08:00:00Z", "2025-03-16T08:00:00Z", "acme/app"),
+                comment(6, "2025-03-15T08:00:00Z", "2025-03-15T08:00:00Z", "acme/app"),
+            ],
+            "cursor-2",
+        ),
+    }
+    cursors = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        cursor = query.split("after: ")[1].splitlines()[0]
+        cursors.append(cursor)
+        return httpx.Response(200, json=pages[cursor])
+
+    github = make_github(handler)
+    events = _collect(
+        github.comments_from(datetime(2025, 3, 16), Exclusions(organizations=["old"]))
+    )
+
+    assert [event.url.split("-")[-1] for event in events] == ["4", "5"]
+    assert events[0].id == "comment-PR_1-issuecomment-4"
+    assert cursors == ["null", '"cursor-1"']
+
+
+def test_failed_queries_raise_instead_of_returning_no_events(make_github):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json={
+                "data": {"search": None},
+                "errors": [{"message": "Something went wrong", "path": ["search"]}],
+            },
+        )
+
+    github = make_github(handler)
+
+    with pytest.raises(DailySummaryQueryError, match="Something went wrong"):
+        _collect(github.issues_from(datetime(2025, 3, 16), Exclusions()))
+
+
+def test_searches_are_made_again_without_rejected_exclusions(make_github):
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        queries.append(request.content.decode() or str(request.url))
+        if "-repo:" not in queries[-1]:
+            if request.method == "GET":
+                return httpx.Response(200, json={"items": []})
+            return httpx.Response(200, json=_search_page([_issue(1)], None))
+
+        if request.method == "GET":
+            return httpx.Response(422, json={"message": "Validation Failed"})
+        return httpx.Response(
+            200,
+            json={
+                "data": {"search": None},
+                "errors": [{"message": "Cannot be searched", "path": ["search"]}],
+            },
+        )
+
+    github = make_github(handler)
+    exclusions = Exclusions(["acme/renamed"])
+    issues = _collect(github.issues_from(datetime(2025, 3, 16), exclusions))
+    commits = _collect(github.commits_from(datetime(2025, 3, 16), exclusions))
+
+    assert [event.id for event in issues] == ["I_1"]
+    assert commits == []
+    # Each search once with the exclusions, rejected without any retry, then
+    # once without them.
+    assert len(queries) == 4
+
+
+def test_contributions_from_pages_each_kind_of_contribution(make_github):
+    def connection(nodes: list[dict], cursor: str | None = None) -> dict:
+        return {
+            "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+            "edges": [{"node": node} for node in nodes],
+        }
+
+    pull_request = _issue(2) | {"id": "PR_2"}
+    review = {
+        "author": {"login": "benmezger"},
+        "state": "APPROVED",
+        "createdAt": "2025-03-16T11:00:00Z",
+        "updatedAt": "2025-03-16T11:00:00Z",
+    }
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        requests.append(query)
+        if "after: null" not in query:
+            collection = {
+                "issueContributions": connection([{"issue": _issue(3)}]),
+            }
+        else:
+            collection = {
+                "issueContributions": connection([{"issue": _issue(1)}], "cursor-1"),
+                "pullRequestContributions": connection([{"pullRequest": pull_request}]),
+                "pullRequestReviewContributions": connection(
+                    [{"pullRequest": pull_request, "pullRequestReview": review}]
+                ),
+            }
+        return httpx.Response(
+            200, json={"data": {"user": {"contributionsCollection": collection}}}
+        )
+
+    github = make_github(handler)
+    events = _collect(github.contributions_from(datetime(2025, 3, 16), Exclusions()))
+
+    assert [(event.id, event.event_type) for event in events] == [
+        ("I_1", EventType.ISSUE),
+        ("I_3", EventType.ISSUE),
+        ("PR_2", EventType.PULL_REQUEST),
+        ("PR_2", EventType.REVIEW),
+    ]
+    assert len(requests) == 2
+    assert (
+        'from: "2025-03-16T00:00:00+00:00", to: "2025-03-17T00:00:00+00:00"'
+        in (requests[0])
+    )
+    assert "pullRequestContributions" not in requests[1]
+
+
+def test_get_user_is_cached_in_memory_and_on_disk(make_github, tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"login": "benmezger", "name": "Ben"})
+
+    accounts = AccountCache(tmp_path)
+    github = make_github(handler, accounts=accounts)
+
+    assert github.get_user() is github.get_user()
+    assert len(requests) == 1
+
+    # Another run with the same token reads the account from disk.
+    other = make_github(handler, accounts=accounts)
+    assert other.get_user() == github.get_user()
+    assert len(requests) == 1
+
+    # Until it expires.
+    accounts.ttl = timedelta(0)
+    make_github(handler, accounts=accounts).get_user()
+    assert len(requests) == 2
+
+
+def test_recorded_exchanges_are_replayed_without_network(tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=_search_page([_issue(1)], None))
+
+    scheduler = _scheduler(handler)
+    scheduler.transport = scheduler.atransport = RecordingTransport(
+        tmp_path, scheduler.transport, scheduler.atransport
+    )
+    github = Github("token", username="benmezger", scheduler=scheduler)
+    since = datetime.fromisoformat("2025-03-16T00:00:00Z")
+    recorded = _collect(github.issues_from(since, Exclusions()))
+
+    replaying = RequestScheduler()
+    replaying.transport = replaying.atransport = ReplayTransport(tmp_path)
+    replayed = Github("other-token", username="benmezger", scheduler=replaying)
+    assert _collect(replayed.issues_from(since, Exclusions())) == recorded
+    assert len(requests) == 1
+
+    # Requests that weren't recorded can't be answered.
+    with pytest.raises(DailySummaryError):
+        _collect(replayed.issues_from(since + timedelta(days=1), Exclusions()))
+
+
+def test_not_modified_responses_without_a_cached_entry_fail(make_github):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(304)
+
+    with pytest.raises(DailySummaryError, match="304"):
+        make_github(handler).get_user()
+    assert len(requests) == 1
+
+
+def test_requests_and_retries_are_counted_per_source(make_github, monkeypatch):
+    retrying = Github._amake_request.retry  # pyright: ignore[reportPrivateUsage, reportFunctionMemberAccess]
+    monkeypatch.setattr(retrying, "wait", tenacity.wait_none())
+    responses = iter(
+        [
+            httpx.Response(502),
+            httpx.Response(200, json=_search_page([_issue(1)], "cursor")),
+            httpx.Response(200, json=_search_page([_issue(2)], None)),
+        ]
+    )
+    github = make_github(lambda request: next(responses))
+
+    def run() -> metrics.Metrics:
+        recorder = metrics.Metrics()
+        metrics.use(recorder)
+        since = datetime.fromisoformat("2025-03-16T00:00:00Z")
+        assert len(_collect(github.issues_from(since, Exclusions()))) == 2
+        return recorder
+
+    recorder = contextvars.copy_context().run(run)
+
+    labels = {"service": "github", "source": "issues", "endpoint": "/graphql"}
+    assert recorder.value("requests_total", status="502", **labels) == 1
+    assert recorder.value("requests_total", status="200", **labels) == 2
+    assert recorder.value("retries_total", **labels) == 1
+
+    file = io.StringIO()
+    recorder.write_prometheus(file)
+    assert (
+        'daily_summary_retries_total{endpoint="/graphql",service="github",'
+        'source="issues"} 1\n' in file.getvalue()
+    )
+
+
+def test_validate_events_takes_the_type_of_event_from_its_source():
+    issues = [_issue(1), {**_issue(2), "id": "PR_2"}]
+    assert validate_events(_copies(issues), EventSource.ISSUES) == [
+        GithubEvent.model_validate(issue) for issue in _copies(issues)
+    ]
+    assert [
+        event.event_type
+        for event in validate_events(_copies(issues), EventSource.ISSUES)
+    ] == [
+        EventType.ISSUE,
+        EventType.PULL_REQUEST,
+    ]
+
+    # Reviewed pull requests are reviews, whatever their id looks like.
+    reviews = validate_events(_copies(issues), EventSource.REVIEWS)
+    assert {event.event_type for event in reviews} == {EventType.REVIEW}
+
+
+def test_events_share_their_repository():
+    first, second = validate_events(_copies([_issue(1), _issue(2)]), EventSource.ISSUES)
+    commit = GithubEvent.model_validate(
+        {**_issue(3), "repository": {"full_name": str(first.repository)}}
+    )
+
+    assert first.repository is second.repository is commit.repository
+    assert first.repository == Repository(
+        owner=first.repository.owner, name=first.repository.name
+    )
+    assert first.repository.repository_url == f"https://github.com/{first.repository}"
+
+
+def _copies(items: list[dict]) -> list[dict]:
+    return json.loads(json.dumps(items))
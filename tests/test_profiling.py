@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 18:55>
+
+import asyncio
+import contextvars
+import io
+import json
+import tracemalloc
+from collections.abc import AsyncIterable
+
+import pytest
+
+from daily.profiling import Profiler, enable, profiled, profiled_iterable, span
+
+
+@profiled_iterable("numbers")
+async def numbers(closed: list[bool]) -> AsyncIterable[int]:
+    try:
+        for n in range(10):
+            yield n
+    finally:
+        closed.append(True)
+
+
+@profiled("double")
+def double(n: int) -> int:
+    return n * 2
+
+
+async def consume(closed: list[bool]) -> list[int]:
+    doubled = []
+    async for n in numbers(closed):
+        if n == 3:
+            break
+        with span("validation"):
+            doubled.append(double(n))
+    return doubled
+
+
+@pytest.mark.parametrize(
+    ("trace_allocations", "peak_memory"), ((False, "resident"), (True, "allocated"))
+)
+def test_profiler_sums_up_spans(trace_allocations: bool, peak_memory: str):
+    def run() -> tuple[Profiler, list[bool]]:
+        profiler = Profiler(trace_allocations)
+        enable(profiler)
+        profiler.start()
+        closed = []
+        assert asyncio.run(consume(closed)) == [0, 2, 4]
+        profiler.stop()
+        return profiler, closed
+
+    profiler, closed = contextvars.copy_context().run(run)
+
+    assert closed == [True]
+    assert {name: span.calls for name, span in profiler.spans.items()} == {
+        "numbers": 1,
+        "double": 3,
+        "validation": 3,
+    }
+
+    file = io.StringIO()
+    profiler.write_json(file)
+    report = json.loads(file.getvalue())
+    assert report["peak_memory_bytes"] > 0
+    assert report["peak_memory"] == peak_memory
+    assert not tracemalloc.is_tracing()
+    assert {span["name"] for span in report["spans"]} == set(profiler.spans)
+
+
+def test_spans_are_not_recorded_without_profiler():
+    closed = []
+    assert asyncio.run(consume(closed)) == [0, 2, 4]
+    assert closed == [True]
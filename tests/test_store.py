@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# Author: Ben Mezger <me@benmezger.nl>
+# Created at <2026-10-18 Sun 13:58>
+
+from datetime import UTC, date, datetime
+
+import pytest
+
+from daily._pipeline import store_scope
+from daily.github import Exclusions, Github, QueryProfile
+from daily.models import EventSource, EventType, GithubEvent
+from daily.store import EventStore
+
+
+@pytest.fixture
+def store(tmp_path) -> EventStore:
+    return EventStore(tmp_path / "events.sqlite3")
+
+
+@pytest.fixture
+def events(github_events: list[GithubEvent]) -> list[GithubEvent]:
+    # Events are keyed by ID, so make them unique across event types.
+    return [
+        event.model_copy(update={"id": f"{event.id}-{event.event_type}"})
+        for event in github_events
+    ]
+
+
+def test_save_round_trips_events(store: EventStore, events: list[GithubEvent]):
+    store.save("scope", EventSource.ISSUES, date(2025, 3, 16), events)
+
+    assert store.events("scope", date(2025, 3, 16)) == events
+    assert store.events("other-scope", date(2025, 3, 16)) == []
+    assert store.events("scope", date(2025, 3, 16), event_types=[EventType.TAG]) == [
+        event for event in events if event.event_type == EventType.TAG
+    ]
+
+
+def test_save_replaces_previous_events(store: EventStore, events: list[GithubEvent]):
+    store.save("scope", EventSource.ISSUES, date(2025, 3, 16), events)
+    store.save("scope", EventSource.ISSUES, date(2025, 3, 16), events[:1])
+
+    assert store.events("scope", date(2025, 3, 16)) == events[:1]
+
+
+@pytest.mark.parametrize(
+    ("synced_at", "expected"),
+    (
+        (None, False),
+        (datetime(2025, 3, 16, 12, tzinfo=UTC), False),
+        (datetime(2025, 3, 17, 0, 30, tzinfo=UTC), False),
+        (datetime(2025, 3, 17, 2, tzinfo=UTC), True),
+    ),
+)
+def test_is_synced_once_fetched_after_the_day_ended(
+    store: EventStore, synced_at: datetime | None, expected: bool
+):
+    if synced_at:
+        store.save("scope", EventSource.TAGS, date(2025, 3, 16), [], synced_at)
+
+    assert store.is_synced("scope", EventSource.TAGS, date(2025, 3, 16)) is expected
+    assert not store.is_synced("scope", EventSource.ISSUES, date(2025, 3, 16))
+
+
+def test_store_scope_tells_query_profiles_apart():
+    def scope(profile: QueryProfile) -> str:
+        return store_scope(Github("token", "benmezger", profile=profile), Exclusions())
+
+    assert scope(QueryProfile.MINIMAL) == scope(QueryProfile.MINIMAL)
+    assert scope(QueryProfile.MINIMAL) != scope(QueryProfile.FULL)
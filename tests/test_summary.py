@@ -9,12 +9,13 @@ from datetime import date
 import pytest
 from snapshottest.pytest import SnapshotTest
 
+from daily._pipeline import group_by_repository
 from daily._summary import (
     maybe_write_github_summaries,
     maybe_write_header,
     maybe_write_misc,
 )
-from daily.models import Account, RepositoryEvents
+from daily.models import Account, EventTable, GithubEvent, RepositoryEvents
 
 
 def test_maybe_write_header(
@@ -90,3 +91,29 @@ def test_maybe_write_github_summaries_with_committed_by_others(
     file.seek(0)
 
     snapshot.assert_match(file.read())
+
+
+def test_event_table_holds_events(
+    github_events_with_committed_by_others: list[GithubEvent],
+):
+    table = EventTable(github_events_with_committed_by_others)
+
+    assert len(table) == len(github_events_with_committed_by_others)
+    assert table.events() == github_events_with_committed_by_others
+    # Rows of the same repository share it.
+    assert table[0].repository is table[2].repository
+
+
+def test_maybe_write_github_summaries_from_event_table(
+    github_events_with_committed_by_others: list[GithubEvent],
+):
+    def render(repository_events: list[RepositoryEvents]) -> str:
+        file = io.StringIO()
+        maybe_write_github_summaries(repository_events, file=file, ollama=None)
+        return file.getvalue()
+
+    table = EventTable(github_events_with_committed_by_others)
+
+    assert render(group_by_repository(table)) == render(
+        group_by_repository(github_events_with_committed_by_others)
+    )